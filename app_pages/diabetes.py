@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+🩸 Diabetes Prediction page of the Health Predictor Web App.
+
+Runs through the navigation of mdps_public.py. The form, scoring, result
+and what-if area form one fragment: submitting the form reruns only that
+region, not the sidebar or the rest of the page.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import streamlit as st
+
+import inference
+import metrics
+from linear_engine import get_linear
+from schema import DIABETES
+from ui_components import (
+    clear_inputs, render_batch_upload, render_explanation, render_inputs,
+    render_model_version, render_sensitivity,
+)
+
+
+# -----------------------------------------------------
+# 2️⃣ CLEAR FORM FUNCTION
+# -----------------------------------------------------
+# The form keeps its values in the session's form store (form_store.py);
+# this resets all input fields back to default values
+def clear_form():
+    clear_inputs(DIABETES)
+
+# -----------------------------------------------------
+# 5️⃣ PAGE HEADER & ACTION BUTTONS
+# -----------------------------------------------------
+col_title, col_btn1, col_btn2 = st.columns([4, 1, 1])
+
+with col_title:
+    st.header("🩸 Diabetes Prediction", divider="blue")
+
+with col_btn1:
+    st.markdown("<br>", unsafe_allow_html=True)
+       
+with col_btn2:    
+     st.markdown("<br>", unsafe_allow_html=True)
+   # st.button("🧹 Clear", type="secondary", on_click=clear_form)
+
+
+# -----------------------------------------------------
+# 🔁 PREDICTION FRAGMENT
+# -----------------------------------------------------
+@st.fragment
+def diabetes_prediction():
+    # -----------------------------------------------------
+    # 7️⃣ DIABETES INPUT FORM
+    # -----------------------------------------------------
+    # Widgets, ranges and layout come from the DIABETES schema
+    with metrics.stage("diabetes", "render_form"), st.form("diabetes_form"):
+
+        values = render_inputs(DIABETES)
+
+        # -------------------------------------------------
+        # 8️⃣ PREDICTION BUTTON
+        # -------------------------------------------------
+        col1, col2 = st.columns(2)
+        with col1:
+            predict_btn = st.form_submit_button("🔍 Diabetes Test Result", type="primary")        
+
+    # -----------------------------------------------------
+    # 9️⃣ DIABETES PREDICTION & VALIDATION
+    # -----------------------------------------------------
+    if predict_btn:
+
+        # -------------------------------------------------
+        # 9.1️⃣ BASIC INPUT VALIDATION
+        # -------------------------------------------------
+        # Collects warnings for unrealistic or unsafe inputs
+        with metrics.stage("diabetes", "validate"):
+            errors = DIABETES.validate_row(values)
+
+        # Display validation errors (if any)
+        if errors:
+            st.error("Please correct the following:")
+            for err in errors:
+                st.write(err)
+        # -------------------------------------------------
+        # 9.2️⃣ MODEL PREDICTION
+        # -------------------------------------------------
+        else:
+            # Predict diabetes outcome (0 = No, 1 = Yes); one model version
+            # for the prediction and its explanation
+            model = get_linear("diabetes")
+            diab_prediction, _ = inference.score(
+                "diabetes", inference.row_from_mapping("diabetes", values),
+                source="ui", model=model,
+            )
+
+            # Display prediction result
+            with metrics.stage("diabetes", "render_result"):
+                if diab_prediction[0] == 1:
+                    st.error("🔴 The person is Diabetic")
+                else:
+                    st.success("🟢 The person is not Diabetic")
+                render_model_version(model.version)
+                render_explanation(DIABETES, values, model=model)
+
+    render_sensitivity(DIABETES, values)
+
+
+diabetes_prediction()
+render_batch_upload("diabetes")
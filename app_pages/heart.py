@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+❤️ Heart Disease Prediction page of the Health Predictor Web App.
+
+Runs through the navigation of mdps_public.py. The form, scoring, result
+and what-if area form one fragment: submitting the form reruns only that
+region, not the sidebar or the rest of the page.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import streamlit as st
+
+import inference
+import metrics
+from linear_engine import get_linear
+from schema import HEART
+from ui_components import (
+    clear_inputs, render_batch_upload, render_explanation, render_inputs,
+    render_model_version, render_sensitivity,
+)
+
+
+# -----------------------------------------------------
+# 2️⃣ CLEAR FORM FUNCTION
+# -----------------------------------------------------
+# The form keeps its values in the session's form store (form_store.py);
+# this resets all heart disease inputs to default values
+def clear_heart_form():
+    clear_inputs(HEART)
+ 
+
+# -----------------------------------------------------
+# 5️⃣ PAGE HEADER & ACTION BUTTONS
+# -----------------------------------------------------
+col_title, col_btn1, col_btn2 = st.columns([4, 1, 1])
+
+with col_title:
+    st.header("❤️ Heart Disease Prediction", divider="red")
+
+with col_btn1:
+    st.markdown("<br>", unsafe_allow_html=True)
+        
+with col_btn2:
+     st.markdown("<br>", unsafe_allow_html=True)
+    #st.button("🧹 Clear", on_click=clear_heart_form)
+
+
+# -----------------------------------------------------
+# 🔁 PREDICTION FRAGMENT
+# -----------------------------------------------------
+@st.fragment
+def heart_prediction():
+    # -----------------------------------------------------
+    # 7️⃣ HEART DISEASE INPUT FORM
+    # -----------------------------------------------------
+    # Widgets, ranges and layout come from the HEART schema
+    with metrics.stage("heart", "render_form"), st.form("heart_form"):
+
+        values = render_inputs(HEART)
+
+        predict_btn = st.form_submit_button("🔍 Heart Disease Test Result", type="primary")
+
+    # -----------------------------------------------------
+    # 8️⃣ PREDICTION & VALIDATION
+    # -----------------------------------------------------
+    if predict_btn:
+
+        # --- Input Validation ---
+        with metrics.stage("heart", "validate"):
+            errors = HEART.validate_row(values)
+
+        # Display validation errors
+        if errors:
+            st.error("Please correct the following:")
+            for e in errors:
+                st.write(e)
+        # -------------------------------------------------
+        # 9️⃣ MODEL INFERENCE & RISK ANALYSIS
+        # -------------------------------------------------
+        else:
+            input_data = inference.row_from_mapping("heart", values)
+
+            # One model version for the prediction and its explanation
+            model = get_linear("heart")
+            prediction, _ = inference.score(
+                "heart", input_data, source="ui", model=model
+            )
+
+            # -------------------------------------------------
+            # 🔟 RESULT DISPLAY
+            # -------------------------------------------------
+            with metrics.stage("heart", "render_result"):
+                if prediction[0] == 1:
+                    st.error("🔴 Heart Disease Detected")
+                else:
+                    st.success("🟢 No Heart Disease Detected")
+                render_model_version(model.version)
+                render_explanation(HEART, values, model=model)
+
+    render_sensitivity(HEART, values)
+
+
+heart_prediction()
+render_batch_upload("heart")
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+🧠 Parkinson’s Prediction page of the Health Predictor Web App.
+
+Runs through the navigation of mdps_public.py. The form, scoring, result
+and what-if area form one fragment: submitting the form reruns only that
+region, not the sidebar or the rest of the page.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import streamlit as st
+
+import inference
+import metrics
+from linear_engine import get_linear
+from schema import PARKINSONS
+from ui_components import (
+    clear_inputs, render_batch_upload, render_explanation, render_inputs,
+    render_model_version, render_sensitivity,
+)
+
+
+# -----------------------------------------------------
+# 2️⃣ CLEAR FORM FUNCTION
+# -----------------------------------------------------
+# The form keeps its values in the session's form store (form_store.py)
+def clear_parkinsons_form():
+    clear_inputs(PARKINSONS)
+
+# -----------------------------------------------------
+# 5️⃣ PAGE HEADER & CLEAR BUTTON
+# -----------------------------------------------------
+col_title, col_btn1, col_btn2 = st.columns([4, 1, 1])
+
+with col_title:
+    st.header("🧠 Parkinson’s Prediction", divider="violet")
+
+with col_btn1:
+    st.markdown("<br>", unsafe_allow_html=True)
+
+with col_btn2:
+     st.markdown("<br>", unsafe_allow_html=True)
+   # st.button("🧹 Clear", type="secondary", on_click=clear_parkinsons_form)
+
+
+# -----------------------------------------------------
+# 🔁 PREDICTION FRAGMENT
+# -----------------------------------------------------
+@st.fragment
+def parkinsons_prediction():
+    # -----------------------------------------------------
+    # 7️⃣ PARKINSON’S INPUT FORM      
+    # -----------------------------------------------------
+    # Frequency, jitter, shimmer, noise and complexity measures,
+    # laid out by the PARKINSONS schema
+    with metrics.stage("parkinsons", "render_form"), st.form("parkinsons_form"):
+
+        values = render_inputs(PARKINSONS)
+
+        predict_btn = st.form_submit_button("🔍 Parkinson's Test Result", type="primary")
+
+    # -----------------------------------------------------
+    # 8️⃣ INPUT VALIDATION & ERROR HANDLING
+    # -----------------------------------------------------
+    if predict_btn:
+
+        # Sanity checks, including the all-zero input check
+        with metrics.stage("parkinsons", "validate"):
+            errors = PARKINSONS.validate_row(values)
+
+        # -------------------------------------------------
+        # 9️⃣ DISPLAY ERRORS OR PERFORM PREDICTION
+        # -------------------------------------------------
+        if errors:
+            st.error("Please fix the following issues before prediction:")
+            for err in errors:
+                st.write(err)
+
+        # --------- Prediction ----------
+        else:
+            input_data = inference.row_from_mapping("parkinsons", values)
+
+            # One model version for the prediction and its explanation
+            model = get_linear("parkinsons")
+            prediction, _ = inference.score(
+                "parkinsons", input_data, source="ui", model=model
+            )
+
+            # -------------------------------------------------
+            # 🔟 RESULT DISPLAY
+            # -------------------------------------------------
+            with metrics.stage("parkinsons", "render_result"):
+                if prediction[0] == 1:
+                    st.error("🔴 Parkinson’s Disease Detected")
+                else:
+                    st.success("🟢 No Parkinson’s Disease Detected")
+                render_model_version(model.version)
+                render_explanation(PARKINSONS, values, model=model)
+
+    render_sensitivity(PARKINSONS, values)
+
+
+parkinsons_prediction()
+render_batch_upload("parkinsons")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+🩺 Full Health Screen page of the Health Predictor Web App.
+
+Runs through the navigation of mdps_public.py. The form, fused scoring
+and result area form one fragment: submitting the form reruns only that
+region, not the sidebar or the rest of the page.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import streamlit as st
+
+import form_store
+import metrics
+import screening
+from ui_components import (
+    render_batch_upload, render_inputs, render_model_version, session_id,
+)
+
+
+# -----------------------------------------------------
+# 1️⃣ PAGE HEADER
+# -----------------------------------------------------
+st.header("🩺 Full Health Screen", divider="green")
+st.caption(
+    "Enter one patient record to screen for all three diseases at once. "
+    "Age is shared between the diabetes and heart models."
+)
+
+
+# -----------------------------------------------------
+# 🔁 PREDICTION FRAGMENT
+# -----------------------------------------------------
+@st.fragment
+def screen_prediction():
+    # -----------------------------------------------------
+    # 2️⃣ COMBINED INPUT FORM
+    # -----------------------------------------------------
+    screen_titles = {
+        "diabetes": "🩸 Diabetes",
+        "heart": "❤️ Heart Disease",
+        "parkinsons": "🧠 Parkinson’s",
+    }
+    # One widget per patient field; shared fields (age) appear once. The
+    # values are those of the session's per-model forms (form_store.py),
+    # so entries carry over to and from the single-disease pages
+    sid = session_id()
+    start = screening.patient_values(
+        {name: form_store.get(sid, name) for name in screening.MODEL_NAMES},
+        {name: form_store.updated_at(sid, name) for name in screening.MODEL_NAMES},
+    )
+    with metrics.stage("screen", "render_form"), st.form("screen_form"):
+
+        values = {}
+        for name in screening.MODEL_NAMES:
+            st.subheader(screen_titles[name])
+            values.update(render_inputs(screening.SECTIONS[name], start))
+
+        predict_btn = st.form_submit_button("🔍 Full Screen Result", type="primary")
+
+    # -----------------------------------------------------
+    # 3️⃣ FUSED PREDICTION & RESULT DISPLAY
+    # -----------------------------------------------------
+    # All three models are scored in one vectorized step; a model whose
+    # inputs fail validation is skipped and its errors are listed
+    if predict_btn:
+        for name in screening.MODEL_NAMES:
+            form_store.update(sid, name, screening.model_values(name, values))
+
+        row = screening.row_from_mapping(values)
+        stacked = screening.get_stacked()
+        predictions, probabilities, valid = screening.screen(
+            [row], source="ui", stacked=stacked
+        )
+        row_errors = screening.errors([row])[0] if not valid.all() else {}
+
+        with metrics.stage("screen", "render_result"):
+            for col, (j, name) in zip(st.columns(3), enumerate(screening.MODEL_NAMES)):
+                with col:
+                    st.markdown(f"**{screen_titles[name]}**")
+                    if not valid[0, j]:
+                        st.warning("Not scored")
+                        for err in row_errors[name]:
+                            st.caption(err)
+                    elif predictions[0, j] == 1:
+                        st.error(f"🔴 Risk {probabilities[0, j]:.0%}")
+                    else:
+                        st.success(f"🟢 Risk {probabilities[0, j]:.0%}")
+                    if valid[0, j]:
+                        render_model_version(stacked.versions[j])
+
+
+screen_prediction()
+render_batch_upload(
+    "screen", score_csv=screening.screen_csv,
+    caption="One row per patient; columns: " + ", ".join(screening.FIELDS)
+    + ". The output adds diabetes_risk, heart_risk and parkinsons_risk.",
+)
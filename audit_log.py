@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Non-blocking prediction audit log for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Every prediction (model, inputs, output, probability, model version,
+timestamp, latency) is appended as one JSON line to ``requests.jsonl``
+without blocking the caller:
+
+* ``log()`` only puts the scored batch on a bounded in-memory queue,
+* a background thread drains the queue, expands batches into one record
+  per row and appends them in buffered writes of at most
+  ``WRITE_SLICE_ROWS`` rows,
+* the file is rotated by size and/or age; rotated files can be gzip
+  compressed. Every rotated file is kept unless ``backups`` limits them
+  to the newest ones (an audit trail is not deleted by default),
+* the queue is flushed on interpreter shutdown.
+
+OVERFLOW POLICY:
+----------------
+When the queue is full the record is dropped instead of blocking the
+Streamlit script thread: ``drop_newest`` (default) discards the incoming
+batch, ``drop_oldest`` discards the oldest queued batch to make room.
+Dropped batches and rows are counted in ``stats()``.
+
+Bulk jobs, which score much faster than records can be written, pass
+``wait=True`` instead: ``log()`` then blocks while more than
+``max_pending_rows`` rows are queued, so nothing is dropped and memory
+stays bounded.
+
+BULK MANIFESTS:
+---------------
+File-to-file jobs (feature store, parallel CSV scoring) whose output
+already holds every input row and result call ``log_bulk()`` once per
+job instead: a single ``"kind": "bulk"`` record names the model version,
+row counts and the sha256 of every input and output file, so the job is
+audited at a fixed cost however many rows it scores.
+
+CONFIGURATION (environment):
+----------------------------
+    MDPS_AUDIT_LOG            log file path (default: requests.jsonl next
+                              to the app; empty string disables logging)
+    MDPS_AUDIT_MAX_BYTES      rotate when the file exceeds this size
+    MDPS_AUDIT_ROTATE_SECONDS rotate when the file is older than this
+    MDPS_AUDIT_COMPRESS       gzip rotated files (default 1)
+    MDPS_AUDIT_BACKUPS        keep only this many rotated files
+                              (default: keep all)
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "requests.jsonl"
+)
+
+# Bytes read per update when hashing a job's files
+HASH_CHUNK_BYTES = 1 << 20
+
+# Rows serialized per write, so a large batch never becomes one huge string
+WRITE_SLICE_ROWS = 10_000
+
+_STOP = object()
+
+
+# =========================================================
+# 📝 AUDIT LOGGER
+# =========================================================
+class AuditLogger:
+
+    def __init__(self, path, max_queue=10_000, flush_interval=0.5,
+                 max_bytes=50 * 1024 * 1024, rotate_seconds=None, backups=None,
+                 compress=True, overflow="drop_newest", max_pending_rows=500_000):
+        if overflow not in ("drop_newest", "drop_oldest"):
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self.compress = compress
+        self.overflow = overflow
+        self.max_pending_rows = max_pending_rows
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._fh = None
+        self._opened_at = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._room = threading.Condition(self._lock)
+        self._pending_rows = 0
+        self.written = self.dropped_batches = self.dropped_rows = 0
+        self.rotations = self.write_errors = self.rotation_errors = 0
+
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="mdps-audit-log"
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -----------------------------------------------------
+    # Producer side (called on the request / script thread)
+    # -----------------------------------------------------
+    def log(self, model_name, version, features, X, predictions,
+            probabilities, latency_ms, source=None, wait=False):
+        """Queue one scored batch; never blocks unless ``wait`` is set.
+
+        With ``wait``, blocks while ``max_pending_rows`` rows are queued
+        (bulk jobs), and only drops the batch if the writer has stopped.
+        """
+        item = (
+            time.time(), model_name, version, features, X, predictions,
+            probabilities, latency_ms, source,
+        )
+        if wait:
+            self._put_waiting(item)
+            return
+
+        try:
+            self._put(item)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == "drop_oldest":
+            try:
+                dropped = self._queue.get_nowait()
+                self._count_drop(dropped)
+                self._written_out([dropped])
+                self._put(item)
+                return
+            except (queue.Empty, queue.Full):
+                pass
+        self._count_drop(item)
+
+    def log_bulk(self, model_name, version, rows, invalid_rows, input_files,
+                 output_file, latency_ms, source=None, output_sha256=None):
+        """Queue one manifest record for a file-to-file bulk job.
+
+        ``input_files`` and ``output_file`` are paths; each is recorded
+        with its sha256 (``output_sha256`` if the caller hashed the output
+        while writing it). Waits for queue room like ``log(wait=True)``.
+        """
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "kind": "bulk",
+            "model": model_name,
+            "model_version": version,
+            "rows": rows,
+            "invalid_rows": invalid_rows,
+            "input_files": [_file_entry(path) for path in input_files],
+            "output_file": _file_entry(output_file, output_sha256),
+            "latency_ms": latency_ms,
+        }
+        if source:
+            record["source"] = source
+        self._put_waiting(record)
+
+    def _put_waiting(self, item):
+        with self._room:
+            while (self._pending_rows >= self.max_pending_rows
+                   and self._thread.is_alive()):
+                self._room.wait(timeout=1.0)
+        while self._thread.is_alive():
+            try:
+                self._put(item, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+        self._count_drop(item)
+
+    def _put(self, item, timeout=None):
+        # Counted first: the writer may take the item before put() returns
+        with self._lock:
+            self._pending_rows += _pending(item)
+        try:
+            self._queue.put(item, block=timeout is not None, timeout=timeout)
+        except queue.Full:
+            self._written_out([item])
+            raise
+
+    def _written_out(self, items):
+        """Items left the queue (written or dropped): wake waiting producers."""
+        with self._room:
+            self._pending_rows -= sum(_pending(item) for item in items)
+            self._room.notify_all()
+
+    def _count_drop(self, item):
+        with self._lock:
+            self.dropped_batches += 1
+            self.dropped_rows += (
+                item["rows"] if isinstance(item, dict) else len(item[4])
+            )
+
+    # -----------------------------------------------------
+    # Consumer side (background thread)
+    # -----------------------------------------------------
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            if item is _STOP:
+                break
+
+            # Drain whatever else is waiting into one buffered write
+            items = [item]
+            stop = False
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is _STOP:
+                    stop = True
+                    break
+                items.append(more)
+
+            try:
+                self._write(items)
+            finally:
+                self._written_out(items)
+            if stop:
+                break
+        self._close_file()
+
+    def _write(self, items):
+        try:
+            fh = self._file()
+            for item in items:
+                if isinstance(item, dict):
+                    fh.write(json.dumps(item) + "\n")
+                    self.written += 1
+                    continue
+                for start in range(0, len(item[4]), WRITE_SLICE_ROWS):
+                    lines = self._lines(item, start, start + WRITE_SLICE_ROWS)
+                    fh.write("\n".join(lines) + "\n")
+                    self.written += len(lines)
+            fh.flush()
+        except OSError:
+            self.write_errors += 1
+        self._maybe_rotate()
+
+    @staticmethod
+    def _lines(item, start, stop):
+        """JSON lines of rows ``start:stop`` of one queued batch."""
+        ts, model, version, features, X, preds, probs, latency_ms, source = item
+        stamp = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+        lines = []
+        for row, pred, prob in zip(X[start:stop].tolist(),
+                                   preds[start:stop].tolist(),
+                                   probs[start:stop].tolist()):
+            record = {
+                "timestamp": stamp,
+                "model": model,
+                "model_version": version,
+                "inputs": dict(zip(features, row)),
+                "prediction": pred,
+                "probability": prob,
+                "latency_ms": latency_ms,
+                "batch_size": len(X),
+            }
+            if source:
+                record["source"] = source
+            lines.append(json.dumps(record))
+        return lines
+
+    def _file(self):
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+            self._opened_at = time.time()
+        return self._fh
+
+    def _close_file(self):
+        if self._fh is not None:
+            fh, self._fh = self._fh, None
+            fh.close()
+
+    # -----------------------------------------------------
+    # Rotation
+    # -----------------------------------------------------
+    def _maybe_rotate(self):
+        if self._fh is None:
+            return
+        too_big = self.max_bytes and self._fh.tell() >= self.max_bytes
+        too_old = (
+            self.rotate_seconds
+            and time.time() - self._opened_at >= self.rotate_seconds
+        )
+        if too_big or too_old:
+            try:
+                self.rotate()
+            except OSError:
+                # Disk full / permissions: keep the writer thread alive and
+                # try again on the next write or idle tick
+                self.rotation_errors += 1
+
+    def rotate(self):
+        """Close the current file and move it aside (background thread)."""
+        self._close_file()
+        if not os.path.exists(self.path):
+            return
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = f"{self.path}.{stamp}"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self.rotations += 1
+        self._prune()
+
+    def _prune(self):
+        if self.backups is None:
+            return
+        directory, base = os.path.split(os.path.abspath(self.path))
+        rotated = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(base + ".")
+        )
+        for name in rotated[:len(rotated) - self.backups]:
+            os.remove(os.path.join(directory, name))
+
+    # -----------------------------------------------------
+    # Shutdown & statistics
+    # -----------------------------------------------------
+    def close(self, timeout=5.0):
+        """Flush every queued record and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._thread.is_alive():
+            return
+        # Waits for room so the stop marker is not dropped, but never
+        # longer than ``timeout``: a stuck writer must not hang shutdown
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "pending_rows": self._pending_rows,
+            "written": self.written,
+            "dropped_batches": self.dropped_batches,
+            "dropped_rows": self.dropped_rows,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors,
+            "rotation_errors": self.rotation_errors,
+        }
+
+
+def _pending(item):
+    """Rows an item holds in memory (a bulk manifest holds none)."""
+    return 0 if isinstance(item, dict) else len(item[4])
+
+
+def file_sha256(path):
+    """sha256 hex digest of a file, read in ``HASH_CHUNK_BYTES`` chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_entry(path, sha256=None):
+    return {"path": os.path.abspath(path), "sha256": sha256 or file_sha256(path)}
+
+
+# =========================================================
+# 🌐 SHARED LOGGER (one per server process)
+# =========================================================
+def _from_environment():
+    path = os.environ.get("MDPS_AUDIT_LOG", DEFAULT_PATH)
+    if not path:
+        return None
+    return AuditLogger(
+        path,
+        max_bytes=int(os.environ.get("MDPS_AUDIT_MAX_BYTES", 50 * 1024 * 1024)),
+        rotate_seconds=float(os.environ.get("MDPS_AUDIT_ROTATE_SECONDS", 0)) or None,
+        compress=os.environ.get("MDPS_AUDIT_COMPRESS", "1") not in ("", "0"),
+        backups=int(os.environ.get("MDPS_AUDIT_BACKUPS") or 0) or None,
+    )
+
+
+audit = _from_environment()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked CSV batch scoring for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Scores cohort CSV files (one patient per row) with any of the three
+models. The file is read and scored in fixed-size chunks, so memory use
+stays bounded however many rows it contains. Every output chunk carries
+the input columns plus ``prediction``, ``probability``,
+``model_version``, ``errors`` and one ``contrib_<feature>`` column per
+input holding its log-odds contribution (explain.py). One model version
+scores and explains a whole chunk. Rows failing validation are not
+scored.
+
+Column names must match the model's feature order (see
+``inference.FEATURES``); extra columns such as patient IDs are passed
+through unchanged.
+
+``score_frame`` accepts a custom scorer so other runners (e.g. the
+multi-process runner in parallel_batch.py) reuse the same validation and
+output format without going through the inference core.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import numpy as np
+import pandas as pd
+
+import explain
+import metrics
+from linear_engine import get_linear
+from schema import SCHEMAS, validate
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+# =========================================================
+# 🧾 COLUMN CHECKS
+# =========================================================
+def check_columns(model_name, columns):
+    """Raise ``ValueError`` if any feature column is missing."""
+    missing = [f for f in SCHEMAS[model_name].keys if f not in columns]
+    if missing:
+        raise ValueError(
+            f"CSV is missing columns required by the {model_name} model: "
+            f"{', '.join(missing)}"
+        )
+
+
+def output_columns(model_name):
+    """Columns appended to every input row of the output."""
+    return [
+        "prediction", "probability", "model_version", "errors",
+        *explain.columns(model_name),
+    ]
+
+
+# =========================================================
+# 🔍 CHUNK SCORING
+# =========================================================
+def score_frame(model_name, frame, scorer=None, model=None):
+    """Validate and score one DataFrame chunk; returns an annotated copy.
+
+    ``scorer(X)`` returns ``(predictions, probabilities)`` for the valid
+    rows; by default they are scored through ``inference.score``.
+    ``model`` is the ``LinearModel`` that scores (by default) and explains
+    the chunk, and whose version is reported (default: the current model,
+    fetched once so a hot swap cannot split the chunk across versions).
+    """
+    if model is None:
+        model = get_linear(model_name)
+    if scorer is None:
+        # Imported lazily: worker processes with their own scorer do not
+        # start the inference core's cache and audit log
+        import inference
+
+        def scorer(X):
+            return inference.score(model_name, X, source="batch", model=model,
+                                   wait=True)
+
+    features = list(SCHEMAS[model_name].keys)
+    X = (
+        frame[features]
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=np.float64)
+    )
+    with metrics.stage(model_name, "validate"):
+        errors = validate(model_name, X)
+    valid = np.fromiter((not e for e in errors), bool, len(errors))
+
+    prediction = np.full(len(frame), np.nan)
+    probability = np.full(len(frame), np.nan)
+    contributions = np.full(X.shape, np.nan)
+    if valid.any():
+        prediction[valid], probability[valid] = scorer(X[valid])
+        contributions[valid] = explain.contributions(model_name, X[valid], model)
+
+    out = frame.copy()
+    out["prediction"] = pd.array(prediction, dtype="Int64")
+    out["probability"] = probability
+    out["model_version"] = np.where(valid, model.version, "")
+    out["errors"] = ["; ".join(e) for e in errors]
+    out[explain.columns(model_name)] = contributions
+    return out
+
+
+def iter_scored_chunks(model_name, source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield scored DataFrame chunks of at most ``chunk_size`` rows.
+
+    ``source`` is a path or file-like object holding CSV data. Columns
+    are checked against the model before any row is scored.
+    """
+    reader = pd.read_csv(source, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            check_columns(model_name, chunk.columns)
+            yield score_frame(model_name, chunk)
+
+
+def score_csv(model_name, source, destination, chunk_size=DEFAULT_CHUNK_SIZE,
+              progress=None):
+    """Score ``source`` into the CSV file ``destination`` chunk by chunk.
+
+    ``progress`` is an optional callback receiving the number of rows
+    scored so far. Returns ``(rows, invalid_rows)``.
+    """
+    rows = invalid = 0
+    for i, chunk in enumerate(iter_scored_chunks(model_name, source, chunk_size)):
+        chunk.to_csv(destination, mode="w" if i == 0 else "a",
+                     header=(i == 0), index=False)
+        rows += len(chunk)
+        invalid += int((chunk["errors"] != "").sum())
+        if progress is not None:
+            progress(rows)
+    return rows, invalid
@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Reproducible, fully offline measurements of
+
+1. cold start   - import time of the app's dependencies and modules, and
+                  the first run of ``mdps_public.py`` (fresh processes),
+2. rerun cost   - one full script rerun per page, using Streamlit's
+                  AppTest harness,
+3. interaction  - round-trip time and server CPU per page rerun and per
+                  form submit, measured against a live ``streamlit run``
+                  server over its websocket (AppTest cannot rerun a
+                  fragment on its own),
+4. latency      - single-row latency distribution (p50 / p95 / p99) of
+                  ``diabetes_model``, ``heart_disease_model`` and
+                  ``parkinsons_model``, both through the inference core
+                  and through the pickled sklearn estimators,
+5. throughput   - batch rows/second at sizes from 1 to 1,000,000 rows.
+
+Results are written as JSON and compared against a stored baseline; a
+gated metric more than ``--threshold`` worse than its baseline is reported
+as a regression and makes the run exit with status 1. Tail percentiles
+(p95 / p99) are recorded but not gated, as they are too noisy on shared
+machines.
+
+USAGE:
+------
+    python benchmarks/run_benchmarks.py                    # run + compare
+    python benchmarks/run_benchmarks.py --quick            # smaller sizes
+    python benchmarks/run_benchmarks.py --update-baseline  # store baseline
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+APP_SCRIPT = os.path.join(APP_DIR, "mdps_public.py")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+sys.path.insert(0, APP_DIR)
+
+# Audit log of the app subprocesses (set by main); the in-process suites
+# run with the audit log disabled
+CHILD_AUDIT_LOG = ""
+
+# Benchmarked page -> its page module (see the navigation in mdps_public.py)
+PAGES = {
+    "diabetes": "app_pages/diabetes.py",
+    "heart": "app_pages/heart.py",
+    "parkinsons": "app_pages/parkinsons.py",
+}
+
+
+# =========================================================
+# 🧰 HELPERS
+# =========================================================
+def metric(value, unit, better="lower", gate=True):
+    return {"value": value, "unit": unit, "better": better, "gate": gate}
+
+
+def percentiles(samples_s, prefix):
+    ms = np.asarray(samples_s) * 1000
+    return {
+        f"{prefix}.p50": metric(float(np.percentile(ms, 50)), "ms"),
+        f"{prefix}.p95": metric(float(np.percentile(ms, 95)), "ms", gate=False),
+        f"{prefix}.p99": metric(float(np.percentile(ms, 99)), "ms", gate=False),
+    }
+
+
+def child_env():
+    """Environment of app subprocesses: audit-logging like a deployment."""
+    return {**os.environ, "MDPS_AUDIT_LOG": CHILD_AUDIT_LOG}
+
+
+def time_subprocess(code, repeat):
+    """Median wall time of ``python -c code`` in fresh processes."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, check=True,
+                       env=child_env(), stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def random_rows(model_name, n, seed=0):
+    from schema import SCHEMAS
+
+    rng = np.random.default_rng(seed)
+    lows, highs = [], []
+    for f in SCHEMAS[model_name].features:
+        lows.append(f.min_value if f.min_value is not None else 0.0)
+        highs.append(f.max_value if f.max_value is not None else 1.0)
+    return rng.uniform(lows, highs, size=(n, len(lows)))
+
+
+# =========================================================
+# 1️⃣ COLD START
+# =========================================================
+def bench_cold_start(repeat):
+    results = {}
+    imports = {
+        "python": "pass",
+        "numpy": "import numpy",
+        "streamlit": "import streamlit",
+        "sklearn": "import sklearn.linear_model",
+        "inference": "import inference",
+        "inference_first_predict": (
+            "import inference; inference.score('heart', [0] * 13)"
+        ),
+    }
+    for name, code in imports.items():
+        results[f"cold_start.import.{name}"] = metric(
+            time_subprocess(code, repeat) * 1000, "ms"
+        )
+
+    first_run = (
+        "import sys, warnings; warnings.simplefilter('ignore');"
+        f"sys.path.insert(0, {APP_DIR!r});"
+        "from streamlit.testing.v1 import AppTest;"
+        f"AppTest.from_file({APP_SCRIPT!r}, default_timeout=120).run()"
+    )
+    results["cold_start.first_app_run"] = metric(
+        time_subprocess(first_run, repeat) * 1000, "ms"
+    )
+    return results
+
+
+# =========================================================
+# 2️⃣ RERUN COST PER PAGE
+# =========================================================
+def bench_reruns(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    from explain import REFERENCE
+
+    results = {}
+    for name, page in PAGES.items():
+        at = AppTest.from_file(APP_SCRIPT, default_timeout=120)
+        at.switch_page(page).run()
+        if at.exception:
+            raise RuntimeError(f"{page} failed: {at.exception}")
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - start)
+        results.update(percentiles(samples, f"rerun.{name}"))
+
+        # One form submit: validation + prediction, with the reference
+        # inputs (the schema defaults fail validation and never score).
+        # AppTest reruns the whole script here, the live server only the
+        # page's fragment (see the interaction suite).
+        for key, value in REFERENCE[name].items():
+            at.number_input(key=key).set_value(value)
+        submit = next(b for b in at.button if "FormSubmitter" in b.id)
+        samples = []
+        for _ in range(max(repeat // 2, 1)):
+            start = time.perf_counter()
+            submit.click().run()
+            samples.append(time.perf_counter() - start)
+        if not any(c.value.startswith("Model version") for c in at.caption):
+            raise RuntimeError(
+                f"{page} submit did not score: "
+                + "; ".join(e.value for e in at.error)
+            )
+        results.update(percentiles(samples, f"submit.{name}"))
+    return results
+
+
+# =========================================================
+# 3️⃣ LIVE-SERVER INTERACTIONS
+# =========================================================
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _process_cpu_ms(pid):
+    """User + system CPU time of process ``pid`` (Linux only)."""
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) * 1000 / os.sysconf("SC_CLK_TCK")
+
+
+async def _interactions(port, pid, name, repeat):
+    """Median round trip and mean server CPU of a rerun and a submit."""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.proto.NumberInput_pb2 import NumberInput
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+    from tornado.websocket import websocket_connect
+
+    from explain import REFERENCE
+
+    ws = await websocket_connect(
+        f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"]
+    )
+
+    async def rerun(widgets=(), fragment_id="", page_hash=""):
+        msg = BackMsg()
+        request = msg.rerun_script
+        request.SetInParent()
+        request.widget_states.widgets.extend(widgets)
+        request.fragment_id = fragment_id
+        request.page_script_hash = page_hash
+        start = time.perf_counter()
+        await ws.write_message(msg.SerializeToString(), binary=True)
+        replies = []
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await ws.read_message())
+            replies.append(reply)
+            if reply.WhichOneof("type") == "script_finished":
+                return time.perf_counter() - start, replies
+
+    def elements(replies):
+        for reply in replies:
+            if reply.WhichOneof("type") == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                yield reply.delta, reply.delta.new_element
+
+    _, replies = await rerun()
+    hashes = {
+        p.url_pathname: p.page_script_hash
+        for reply in replies if reply.WhichOneof("type") == "navigation"
+        for p in reply.navigation.app_pages
+    }
+    # The default page (diabetes) is served at "/", the others under
+    # their file name
+    page_hash = hashes.get(name, hashes[""])
+    _, replies = await rerun(page_hash=page_hash)
+
+    # Fill the form with a typical patient and find its submit button
+    widgets, submit, fragment_id = [], None, ""
+    for delta, element in elements(replies):
+        kind = element.WhichOneof("type")
+        if kind == "number_input":
+            field = element.number_input
+            value = REFERENCE[name][field.id.rsplit("-", 1)[1]]
+            if field.data_type == NumberInput.INT:
+                widgets.append(WidgetState(id=field.id, int_value=int(value)))
+            else:
+                widgets.append(WidgetState(id=field.id, double_value=float(value)))
+        elif kind == "button" and "FormSubmitter" in element.button.id:
+            submit, fragment_id = element.button.id, delta.fragment_id
+    widgets.append(WidgetState(id=submit, trigger_value=True))
+
+    results = {}
+    for label, args in (("rerun", ((), "")), ("submit", (widgets, fragment_id))):
+        await rerun(*args, page_hash)
+        samples = []
+        cpu = _process_cpu_ms(pid)
+        for _ in range(repeat):
+            elapsed, replies = await rerun(*args, page_hash)
+            samples.append(elapsed)
+        cpu = (_process_cpu_ms(pid) - cpu) / repeat
+        if label == "submit" and not any(e.WhichOneof("type") == "alert" for _, e in elements(replies)):
+            raise RuntimeError(f"{name} submit produced no result")
+        results[f"interaction.{name}.{label}.rtt"] = metric(
+            statistics.median(samples) * 1000, "ms"
+        )
+        results[f"interaction.{name}.{label}.server_cpu"] = metric(cpu, "ms")
+    ws.close()
+    return results
+
+
+def bench_interactions(repeat):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_SCRIPT,
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=APP_DIR, env=child_env(), stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), 0.1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("streamlit server did not start")
+                time.sleep(0.1)
+
+        results = {}
+        for name in PAGES:
+            results.update(asyncio.run(_interactions(port, server.pid, name, repeat)))
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# =========================================================
+# 4️⃣ SINGLE-ROW LATENCY
+# =========================================================
+def bench_latency(repeat):
+    import inference
+    from model_registry import registry
+
+    results = {}
+    for name in PAGES:
+        rows = random_rows(name, repeat)
+        estimator = registry.get(name)
+
+        samples = []
+        for row in rows:
+            start = time.perf_counter()
+            inference.score(name, row, use_cache=False)
+            samples.append(time.perf_counter() - start)
+        results.update(percentiles(samples, f"latency.{name}.engine"))
+
+        samples = []
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            for row in rows:
+                start = time.perf_counter()
+                estimator.predict([row.tolist()])
+                samples.append(time.perf_counter() - start)
+        results.update(percentiles(samples, f"latency.{name}.sklearn"))
+    return results
+
+
+# =========================================================
+# 5️⃣ BATCH THROUGHPUT
+# =========================================================
+def bench_throughput(sizes):
+    import inference
+
+    results = {}
+    for name in PAGES:
+        for size in sizes:
+            X = random_rows(name, size)
+            inference.score(name, X[:1], use_cache=False)
+            rounds = max(1, min(1000, 200_000 // size))
+            start = time.perf_counter()
+            for _ in range(rounds):
+                inference.score(name, X, use_cache=False)
+            elapsed = (time.perf_counter() - start) / rounds
+            results[f"throughput.{name}.{size}"] = metric(
+                size / elapsed, "rows/s", better="higher"
+            )
+    return results
+
+
+# =========================================================
+# 📏 BASELINE COMPARISON
+# =========================================================
+def compare(results, baseline, threshold):
+    """Return a list of human-readable regression descriptions."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not current.get("gate", True) or base is None or not base["value"]:
+            continue
+        if current["better"] == "lower":
+            ratio = current["value"] / base["value"]
+        else:
+            ratio = base["value"] / max(current["value"], 1e-12)
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{key}: {current['value']:.4g} {current['unit']} "
+                f"vs baseline {base['value']:.4g} ({ratio:.2f}x worse)"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Health Predictor benchmarks")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed relative slowdown before failing (0.5 = 50%%)")
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--skip", nargs="*", default=[],
+                        choices=["cold_start", "rerun", "interaction", "latency", "throughput"])
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    global CHILD_AUDIT_LOG
+    # App subprocesses keep benchmark predictions out of the real audit
+    # log. In this process the log is off: a writer thread still draining
+    # one suite's records would compete for the GIL with the next suite
+    CHILD_AUDIT_LOG = os.environ.get("MDPS_AUDIT_LOG", os.path.join(
+        tempfile.mkdtemp(prefix="mdps-bench-"), "audit.jsonl"))
+    os.environ["MDPS_AUDIT_LOG"] = ""
+    sizes = [1, 10, 100, 1_000, 10_000, 100_000]
+    if not args.quick:
+        sizes.append(1_000_000)
+
+    results = {}
+    suites = [
+        ("cold_start", lambda: bench_cold_start(3 if args.quick else 5)),
+        ("rerun", lambda: bench_reruns(10 if args.quick else 30)),
+        ("interaction", lambda: bench_interactions(10 if args.quick else 40)),
+        ("latency", lambda: bench_latency(500 if args.quick else 5000)),
+        ("throughput", lambda: bench_throughput(sizes)),
+    ]
+    for name, run in suites:
+        if name in args.skip:
+            continue
+        print(f"Running {name} benchmarks...", flush=True)
+        results.update(run())
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    for key, m in sorted(results.items()):
+        print(f"{key:45s} {m['value']:14.4f} {m['unit']}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --update-baseline to create one.")
+        return 0
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Exact per-feature explanations for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Every model is a logistic regression, so its log-odds split exactly
+into one additive term per input:
+
+    logit(p) = base + sum_j coef[j] * (x[j] - reference[j])
+
+where ``reference`` is a typical patient (approximate medians of the
+public datasets the models were trained on) and ``base`` is the log-odds
+of that reference patient. ``coef[j] * (x[j] - reference[j])`` is the
+contribution of feature ``j``: positive values push the prediction
+towards the disease, negative values away from it. For linear models
+this is what SHAP's linear explainer computes, at the cost of one
+element-wise product for a whole batch.
+
+USAGE:
+------
+    contrib = explain.contributions("heart", X)          # (n_rows, 13)
+    ranked = explain.ranked("heart", X[0], limit=5)      # [(feature, value)]
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import numpy as np
+
+from linear_engine import get_linear
+from schema import SCHEMAS
+
+# =========================================================
+# 🧍 REFERENCE PATIENTS
+# =========================================================
+# Approximate medians of the Pima Indians Diabetes, UCI Heart Disease and
+# UCI Parkinson's datasets
+REFERENCE = {
+    "diabetes": {
+        "Pregnancies": 3, "Glucose": 117, "BloodPressure": 72,
+        "SkinThickness": 23, "Insulin": 30, "BMI": 32.0, "DPF": 0.3725,
+        "Age": 29,
+    },
+    "heart": {
+        "age": 55, "sex": 1, "cp": 1, "trestbps": 130, "chol": 240,
+        "fbs": 0, "restecg": 1, "thalach": 153, "exang": 0, "oldpeak": 0.8,
+        "slope": 1, "ca": 0, "thal": 2,
+    },
+    "parkinsons": {
+        "fo": 148.79, "fhi": 175.829, "flo": 104.315,
+        "Jitter_percent": 0.00494, "Jitter_Abs": 0.00003, "RAP": 0.0025,
+        "PPQ": 0.00269, "DDP": 0.00749, "Shimmer": 0.02297,
+        "Shimmer_dB": 0.221, "APQ3": 0.01279, "APQ5": 0.01347,
+        "APQ": 0.01826, "DDA": 0.03836, "NHR": 0.01166, "HNR": 22.085,
+        "RPDE": 0.495954, "DFA": 0.722254, "spread1": -5.720868,
+        "spread2": 0.218885, "D2": 2.361532, "PPE": 0.194052,
+    },
+}
+
+_REFERENCE_ROWS = {
+    name: np.array([REFERENCE[name][k] for k in SCHEMAS[name].keys], dtype=np.float64)
+    for name in SCHEMAS
+}
+
+
+def columns(model_name):
+    """Names of the contribution columns added to batch outputs."""
+    return [f"contrib_{k}" for k in SCHEMAS[model_name].keys]
+
+
+# =========================================================
+# 🔍 CONTRIBUTIONS
+# =========================================================
+def contributions(model_name, X, model=None):
+    """``(n_rows, n_features)`` log-odds contribution of every input.
+
+    ``model`` is the ``LinearModel`` to explain (default: the current
+    one of ``model_name``).
+    """
+    model = model or get_linear(model_name)
+    X = np.asarray(X, dtype=np.float64)
+    # + 0.0 turns the -0.0 of reference-valued inputs into 0.0
+    return (X - _REFERENCE_ROWS[model_name]) * model.coef + 0.0
+
+
+def base_value(model_name, model=None):
+    """Log-odds of the reference patient."""
+    model = model or get_linear(model_name)
+    return float(_REFERENCE_ROWS[model_name] @ model.coef.ravel() + model.intercept[0])
+
+
+def ranked(model_name, row, limit=None, model=None):
+    """``[(feature, contribution)]`` of one row, largest effect first."""
+    contrib = contributions(model_name, np.reshape(row, (1, -1)), model=model)[0]
+    order = np.argsort(-np.abs(contrib), kind="stable")[:limit]
+    keys = SCHEMAS[model_name].keys
+    return [(keys[i], float(contrib[i])) for i in order]
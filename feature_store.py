@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped binary feature store for cohort scoring.
+
+PURPOSE:
+--------
+For 8-22 float features, parsing CSV costs far more than the model math.
+Cohort files are therefore converted once into a compact binary file
+(``.mdps``) and scored straight from a ``numpy.memmap``:
+
+    +--------------------------------------------------------------+
+    | magic  b"MDPSFS01"                                  8 bytes |
+    | JSON header (model, features, dtype, n_rows), space padded  |
+    |                                          to HEADER_SIZE bytes |
+    +--------------------------------------------------------------+
+    | float64 little-endian feature matrix, row-major,            |
+    | n_rows x n_features, in the model's feature order            |
+    +--------------------------------------------------------------+
+
+Rows are stored contiguously (row-major) so any block of rows is a
+zero-copy ``(rows, n_features)`` view that the linear engine scores
+directly with ``X @ coef.T``; no per-column gather is needed.
+
+Scoring a file much larger than RAM streams it block by block: the only
+resident memory is the current block and the memory-mapped output. Each
+scored store is audited by one manifest record (audit_log.py, source
+``feature_store``): model version, row counts and the sha256 of the
+``.mdps`` input and the ``.npy`` output, which together hold every row's
+inputs and result.
+
+USAGE:
+------
+    python feature_store.py convert heart cohort.csv cohort.mdps
+    python feature_store.py convert heart requests.jsonl cohort.mdps
+    python feature_store.py score cohort.mdps scored.npy
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from audit_log import audit
+from linear_engine import get_linear
+from schema import SCHEMAS
+
+MAGIC = b"MDPSFS01"
+HEADER_SIZE = 4096
+DTYPE = "<f8"
+DEFAULT_BLOCK_ROWS = 262_144
+
+# Output record of ``score_store`` (one per input row)
+RESULT_DTYPE = np.dtype([
+    ("prediction", "i1"),     # -1 for rows failing validation
+    ("probability", "<f8"),   # NaN for rows failing validation
+])
+
+
+# =========================================================
+# 🧾 HEADER
+# =========================================================
+def _encode_header(model_name, n_rows):
+    header = json.dumps({
+        "model": model_name,
+        "features": list(SCHEMAS[model_name].keys),
+        "dtype": DTYPE,
+        "n_rows": n_rows,
+        "layout": "row-major",
+    }).encode()
+    if len(MAGIC) + len(header) > HEADER_SIZE:
+        raise ValueError("feature store header too large")
+    return MAGIC + header.ljust(HEADER_SIZE - len(MAGIC))
+
+
+def read_header(path):
+    with open(path, "rb") as fh:
+        raw = fh.read(HEADER_SIZE)
+    if not raw.startswith(MAGIC):
+        raise ValueError(f"{path} is not a feature store file")
+    return json.loads(raw[len(MAGIC):].decode())
+
+
+# =========================================================
+# ✍️ WRITER / CONVERTERS
+# =========================================================
+class StoreWriter:
+    """Appends float rows to a new store; the row count is patched on close."""
+
+    def __init__(self, path, model_name):
+        self.path = path
+        self.model_name = model_name
+        self.n_features = len(SCHEMAS[model_name].keys)
+        self.n_rows = 0
+        self._fh = open(path, "wb")
+        self._fh.write(_encode_header(model_name, 0))
+
+    def write(self, X):
+        X = np.ascontiguousarray(X, dtype=DTYPE)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"expected {self.n_features} features per row, got {X.shape}"
+            )
+        self._fh.write(X.tobytes())
+        self.n_rows += len(X)
+
+    def close(self):
+        self._fh.seek(0)
+        self._fh.write(_encode_header(self.model_name, self.n_rows))
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close()
+        if exc_type is not None:
+            os.remove(self.path)
+        return False
+
+
+def convert_csv(model_name, source, path, chunk_size=100_000):
+    """Convert a CSV cohort file (feature columns by name) to a store."""
+    keys = list(SCHEMAS[model_name].keys)
+    with StoreWriter(path, model_name) as writer, \
+            pd.read_csv(source, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            missing = [k for k in keys if k not in chunk.columns]
+            if missing:
+                raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+            writer.write(
+                chunk[keys].apply(pd.to_numeric, errors="coerce").to_numpy()
+            )
+    return writer.n_rows
+
+
+def convert_jsonl(model_name, source, path, chunk_size=100_000):
+    """Convert JSON lines to a store.
+
+    Each line is either a flat ``{feature: value}`` object or an audit log
+    record (``{"model": ..., "inputs": {...}}``); audit records of other
+    models and unrelated lines are skipped. Missing values become NaN.
+    """
+    keys = SCHEMAS[model_name].keys
+    rows = []
+    with StoreWriter(path, model_name) as writer, \
+            open(source, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or record.get("kind") == "bulk":
+                continue
+            if "inputs" in record:
+                if record.get("model") != model_name:
+                    continue
+                record = record["inputs"]
+            if not any(k in record for k in keys):
+                continue
+            rows.append([record.get(k, np.nan) for k in keys])
+            if len(rows) >= chunk_size:
+                writer.write(np.array(rows, dtype=np.float64))
+                rows = []
+        if rows:
+            writer.write(np.array(rows, dtype=np.float64))
+    return writer.n_rows
+
+
+# =========================================================
+# 📖 READER
+# =========================================================
+def open_store(path):
+    """Return ``(header, matrix)``; ``matrix`` is a read-only memmap."""
+    header = read_header(path)
+    shape = (header["n_rows"], len(header["features"]))
+    if shape[0] == 0:
+        return header, np.empty(shape, dtype=header["dtype"])
+    matrix = np.memmap(path, dtype=header["dtype"], mode="r",
+                       offset=HEADER_SIZE, shape=shape)
+    # Rows are read front to back: let the kernel read ahead
+    if hasattr(matrix, "_mmap") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        matrix._mmap.madvise(mmap.MADV_SEQUENTIAL)
+    return header, matrix
+
+
+def iter_blocks(path, block_rows=DEFAULT_BLOCK_ROWS):
+    """Yield ``(start_row, block)``; each block is a zero-copy view."""
+    _, matrix = open_store(path)
+    for start in range(0, matrix.shape[0], block_rows):
+        yield start, matrix[start:start + block_rows]
+
+
+# =========================================================
+# 🔍 SCORING
+# =========================================================
+def score_store(path, destination, block_rows=DEFAULT_BLOCK_ROWS, progress=None):
+    """Score a store into a ``.npy`` file of ``RESULT_DTYPE`` records.
+
+    Rows failing the model's validation rules get prediction -1 and
+    probability NaN. The job is audit-logged as one bulk manifest.
+    Returns ``(rows, invalid_rows)``.
+    """
+    header, matrix = open_store(path)
+    model_name = header["model"]
+    if tuple(header["features"]) != SCHEMAS[model_name].keys:
+        raise ValueError(f"{path}: feature order does not match the model")
+
+    schema = SCHEMAS[model_name]
+    model = get_linear(model_name)
+    results = np.lib.format.open_memmap(
+        destination, mode="w+", dtype=RESULT_DTYPE, shape=(matrix.shape[0],)
+    )
+    invalid = 0
+    scored_at = time.perf_counter()
+    for start, block in iter_blocks(path, block_rows):
+        out = results[start:start + len(block)]
+        valid = schema.valid_mask(block)
+        # Score whole blocks, then blank the invalid rows (no compaction copy)
+        out["prediction"], out["probability"] = model.score(block)
+        out["prediction"][~valid] = -1
+        out["probability"][~valid] = np.nan
+        invalid += int(len(block) - valid.sum())
+        if progress is not None:
+            progress(start + len(block))
+    results.flush()
+    del results
+    latency_ms = (time.perf_counter() - scored_at) * 1000
+    if audit is not None:
+        audit.log_bulk(model_name, model.version, matrix.shape[0], invalid,
+                       [path], destination, latency_ms, "feature_store")
+    return matrix.shape[0], invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Binary cohort feature store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="CSV / JSONL -> .mdps")
+    convert.add_argument("model", choices=sorted(SCHEMAS))
+    convert.add_argument("source")
+    convert.add_argument("path")
+
+    score = sub.add_parser("score", help=".mdps -> .npy predictions")
+    score.add_argument("path")
+    score.add_argument("destination")
+    score.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "convert":
+        if args.source.endswith((".jsonl", ".json")):
+            rows = convert_jsonl(args.model, args.source, args.path)
+        else:
+            rows = convert_csv(args.model, args.source, args.path)
+        print(f"Wrote {rows:,} rows to {args.path}")
+    else:
+        rows, invalid = score_store(args.path, args.destination, args.block_rows)
+        print(f"Scored {rows:,} rows ({invalid:,} invalid)")
+        # Write the queued audit manifest before exiting
+        if audit is not None:
+            audit.close(timeout=None)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.2f} s ({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Compact per-session form values for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Each page used to copy its schema defaults into ``st.session_state``, as
+one boxed Python value per input and session. Streamlit drops the state
+of widgets that are not rendered, so the entered values were also lost
+whenever the user switched pages.
+
+Here the form values of every session live in one float64 slab per
+model, of shape ``(capacity, n_features)``. Each session gets one row
+(slot), indexed by feature position:
+
+* a session costs 8 bytes per input of each model it used, plus two
+  8-byte timestamps per slot (last access, last update),
+* the screen page reads the same rows and writes them back on submit,
+  so values entered on one page prefill the others. A shared field
+  (age) shows the value of the row updated last,
+* ``evict_idle`` releases the slots of sessions idle for longer than
+  ``MDPS_FORM_TTL`` seconds (default 1800) for reuse. An evicted session
+  starts again from the defaults. Every access sweeps at most once per
+  ``SWEEP_SECONDS``, so no background thread is needed,
+* ``usage(session_id)`` and ``stats()`` report the memory held.
+
+The slab doubles when it is full and is never shrunk.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import os
+import threading
+import time
+
+import numpy as np
+
+import metrics
+from schema import SCHEMAS
+
+FORM_TTL = float(os.environ.get("MDPS_FORM_TTL", 1800))
+SWEEP_SECONDS = 60.0
+INITIAL_CAPACITY = 64
+
+
+# =========================================================
+# 🗃️ ONE MODEL'S FORMS
+# =========================================================
+class FormStore:
+    """Form values of every session for one model, in one float64 slab."""
+
+    def __init__(self, schema, capacity=INITIAL_CAPACITY):
+        self.schema = schema
+        self.defaults = np.array([f.default for f in schema.features], dtype=np.float64)
+        self._values = np.tile(self.defaults, (capacity, 1))
+        self._last_seen = np.zeros(capacity)
+        self._updated = np.zeros(capacity)
+        self._slots = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._slots)
+
+    @property
+    def row_bytes(self):
+        """Bytes one session's slot holds (values + timestamps)."""
+        return (
+            self._values.itemsize * self._values.shape[1]
+            + self._last_seen.itemsize + self._updated.itemsize
+        )
+
+    @property
+    def nbytes(self):
+        return self._values.nbytes + self._last_seen.nbytes + self._updated.nbytes
+
+    def _slot(self, session_id):
+        slot = self._slots.get(session_id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._values[slot] = self.defaults
+            self._updated[slot] = 0.0
+            self._slots[session_id] = slot
+        self._last_seen[slot] = time.monotonic()
+        return slot
+
+    def _grow(self):
+        capacity = len(self._values)
+        self._values = np.concatenate([self._values, np.tile(self.defaults, (capacity, 1))])
+        self._last_seen = np.concatenate([self._last_seen, np.zeros(capacity)])
+        self._updated = np.concatenate([self._updated, np.zeros(capacity)])
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def get(self, session_id):
+        """``{feature: value}`` of the session (the defaults for a new one)."""
+        with self._lock:
+            row = self._values[self._slot(session_id)].tolist()
+        return {f.key: f.dtype(v) for f, v in zip(self.schema.features, row)}
+
+    def update(self, session_id, values):
+        """Store the ``{feature: value}`` mapping ``values`` of the session."""
+        row = [values[k] for k in self.schema.keys]
+        with self._lock:
+            slot = self._slot(session_id)
+            self._values[slot] = row
+            self._updated[slot] = self._last_seen[slot]
+
+    def reset(self, session_id):
+        """Set the session's values back to the defaults."""
+        with self._lock:
+            slot = self._slot(session_id)
+            self._values[slot] = self.defaults
+            self._updated[slot] = self._last_seen[slot]
+
+    def updated_at(self, session_id):
+        """``time.monotonic()`` of the session's last update (0 if never)."""
+        with self._lock:
+            slot = self._slots.get(session_id)
+            return 0.0 if slot is None else float(self._updated[slot])
+
+    def holds(self, session_id):
+        return session_id in self._slots
+
+    def evict_idle(self, ttl, now=None):
+        """Release the slots of sessions idle for ``ttl`` seconds; returns their count."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                session_id for session_id, slot in self._slots.items()
+                if now - self._last_seen[slot] > ttl
+            ]
+            for session_id in idle:
+                self._free.append(self._slots.pop(session_id))
+        return len(idle)
+
+
+# =========================================================
+# 🌐 PROCESS-WIDE STORES
+# =========================================================
+# Shared by every session and thread of the server process
+stores = {name: FormStore(schema) for name, schema in SCHEMAS.items()}
+
+_last_sweep = time.monotonic()
+_sweep_lock = threading.Lock()
+
+
+def _sweep():
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < SWEEP_SECONDS or not _sweep_lock.acquire(blocking=False):
+        return
+    try:
+        _last_sweep = now
+        evict_idle(FORM_TTL, now)
+    finally:
+        _sweep_lock.release()
+
+
+def get(session_id, model_name):
+    """``{feature: value}`` of one session's ``model_name`` form."""
+    _sweep()
+    return stores[model_name].get(session_id)
+
+
+def update(session_id, model_name, values):
+    stores[model_name].update(session_id, values)
+
+
+def reset(session_id, model_name):
+    stores[model_name].reset(session_id)
+
+
+def updated_at(session_id, model_name):
+    return stores[model_name].updated_at(session_id)
+
+
+def evict_idle(ttl=FORM_TTL, now=None):
+    """Release every form slot idle for ``ttl`` seconds; returns their count."""
+    evicted = 0
+    for name, store in stores.items():
+        n = store.evict_idle(ttl, now)
+        if n:
+            metrics.inc("form_slots_evicted", name, n)
+        evicted += n
+    return evicted
+
+
+def usage(session_id):
+    """Bytes of form values ``session_id`` holds, across all models."""
+    return sum(s.row_bytes for s in stores.values() if s.holds(session_id))
+
+
+def stats():
+    """Sessions holding form values, and the bytes allocated for all of them."""
+    sessions = set()
+    for store in stores.values():
+        sessions.update(store._slots)
+    return {
+        "sessions": len(sessions),
+        "bytes": sum(s.nbytes for s in stores.values()),
+    }
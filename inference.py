@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Headless inference core for the Health Predictor Web App.
+
+PURPOSE:
+--------
+All prediction logic used to live inline in the Streamlit page blocks,
+each scoring a single Python list with ``model.predict([[...]])``. This
+module exposes the same models to any front end (Streamlit UI, batch
+jobs, HTTP service) through a vectorized API over 2-D NumPy arrays, so
+thousands of rows are scored in one call.
+
+Scoring runs on the sklearn-free engine (linear_engine.py), whose results
+are bit-identical to ``LogisticRegression.predict`` / ``predict_proba``.
+``score`` additionally consults the shared prediction cache
+(prediction_cache.py), configured through the ``MDPS_CACHE_*`` variables,
+and hands every scored row to the asynchronous audit log (audit_log.py).
+
+Every model has a fixed feature order (``FEATURES``); the columns of
+``X`` must follow it.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import os
+import time
+
+import numpy as np
+
+import metrics
+from audit_log import audit
+from linear_engine import get_linear
+from prediction_cache import PredictionCache
+from schema import SCHEMAS
+
+# =========================================================
+# 🧾 FEATURE ORDERS (must match the training column order)
+# =========================================================
+# Taken from the declarative input schemas (schema.py):
+# 8 diabetes, 13 heart and 22 Parkinson's features.
+FEATURES = {name: s.keys for name, s in SCHEMAS.items()}
+
+MODEL_NAMES = tuple(FEATURES)
+
+# =========================================================
+# 🗄️ SHARED PREDICTION CACHE (one per server process)
+# =========================================================
+cache = PredictionCache(
+    max_entries=int(os.environ.get("MDPS_CACHE_SIZE", 100_000)),
+    ttl=float(os.environ.get("MDPS_CACHE_TTL", 0)) or None,
+    db_path=os.environ.get("MDPS_CACHE_DB") or None,
+)
+
+
+# =========================================================
+# 🧰 INPUT HELPERS
+# =========================================================
+def as_matrix(model_name, X):
+    """Convert ``X`` to a float64 ``(n_rows, n_features)`` array.
+
+    A single row (1-D sequence) is accepted and promoted to one row.
+    Raises ``ValueError`` if the column count does not match the model.
+    """
+    features = FEATURES[model_name]
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[1] != len(features):
+        raise ValueError(
+            f"{model_name} expects {len(features)} features per row "
+            f"({', '.join(features)}); got array of shape {X.shape}"
+        )
+    return X
+
+
+def row_from_mapping(model_name, values):
+    """Build one feature row from a ``{feature: value}`` mapping."""
+    return [values[name] for name in FEATURES[model_name]]
+
+
+# =========================================================
+# 🔍 PREDICTION API
+# =========================================================
+def predict(model_name, X):
+    """Predicted class (0/1) for every row of ``X``."""
+    return get_linear(model_name).predict(as_matrix(model_name, X))
+
+
+def predict_proba(model_name, X):
+    """Probability of the positive class (1) for every row of ``X``."""
+    return get_linear(model_name).predict_proba(as_matrix(model_name, X))[:, 1]
+
+
+def score(model_name, X, use_cache=True, source=None, model=None, wait=False):
+    """``(predictions, probabilities)`` for every row of ``X``.
+
+    Computes both outputs from one decision function. Rows seen before
+    under the same model version are served from the shared cache.
+    ``source`` ("ui", "batch", "api", ...) is recorded in the audit log.
+    ``model`` is the ``LinearModel`` to score with (default: the active
+    version of ``model_name``). Bulk callers pass ``wait`` so their audit
+    records wait for queue room instead of being dropped.
+    """
+    start = time.perf_counter()
+    with metrics.stage(model_name, "predict"):
+        X = as_matrix(model_name, X)
+        model = model or get_linear(model_name)
+        metrics.inc("rows_scored", model_name, len(X))
+        predictions, probabilities = _score(model_name, model, X, use_cache)
+
+    if audit is not None:
+        audit.log(
+            model_name, model.version, FEATURES[model_name], X, predictions,
+            probabilities, (time.perf_counter() - start) * 1000, source,
+            wait=wait,
+        )
+    return predictions, probabilities
+
+
+def _score(model_name, model, X, use_cache):
+    if not use_cache or cache is None or len(X) > cache.max_rows:
+        return model.score(X)
+
+    keys = cache.row_keys(model_name, model.version, X)
+    found = cache.lookup(model_name, model.version, keys)
+    predictions = np.empty(len(X), dtype=model.classes.dtype)
+    probabilities = np.empty(len(X), dtype=np.float64)
+    for i, (label, proba) in found.items():
+        predictions[i], probabilities[i] = label, proba
+
+    missing = [i for i in range(len(X)) if i not in found]
+    if missing:
+        predictions[missing], probabilities[missing] = model.score(X[missing])
+        cache.store(
+            model_name, model.version, [keys[i] for i in missing],
+            predictions[missing], probabilities[missing],
+        )
+    return predictions, probabilities
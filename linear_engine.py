@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+sklearn-free scoring engine for the Health Predictor Web App.
+
+PURPOSE:
+--------
+All three ``.sav`` files are plain ``sklearn.linear_model.LogisticRegression``
+pickles, so scoring is one dot product plus a sigmoid. This module
+
+* exports each model's ``coef_``, ``intercept_``, ``classes_`` and feature
+  order to a compact ``.npz`` file next to its ``.sav`` file, and
+* scores from those files with NumPy only, reproducing the arithmetic of
+  ``LogisticRegression.decision_function`` / ``predict`` /
+  ``predict_proba`` exactly, so results are bit-identical to sklearn.
+
+Workers that only score never import scikit-learn. If an export is
+missing or was made from a different ``.sav`` file, the engine falls back
+to unpickling the model once through the shared registry. The loaded
+model becomes the registry's active version; a ``.sav`` file that changes
+on disk is validated and swapped in by the model watcher
+(model_watcher.py).
+
+USAGE:
+------
+    python linear_engine.py export          # (re)write the .npz files
+    python linear_engine.py parity          # compare against sklearn
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import hashlib
+import math
+import os
+import sys
+import threading
+import time
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+import metrics
+from model_registry import registry
+
+# Largest argument math.exp() accepts without overflowing (log(DBL_MAX))
+_EXP_MAX = 709.782712893384
+
+
+# =========================================================
+# 🧮 EXACT SIGMOID
+# =========================================================
+def _exp_or_inf(value):
+    try:
+        return math.exp(value)
+    except OverflowError:
+        return math.inf
+
+
+def expit(x, exact=True):
+    """Logistic sigmoid ``1 / (1 + exp(-x))`` of a 1-D float64 array.
+
+    With ``exact=True`` the exponential goes through the C library
+    (``math.exp``), as ``scipy.special.expit`` does, so results match
+    sklearn to the last bit. NumPy's vectorized ``np.exp`` can differ by
+    one ulp; pass ``exact=False`` to trade that for speed.
+    """
+    neg = -x
+    if not exact:
+        with np.errstate(over="ignore"):
+            return 1.0 / (1.0 + np.exp(neg))
+
+    big = neg > _EXP_MAX
+    if big.any():
+        exp_neg = np.fromiter(map(_exp_or_inf, neg.tolist()), np.float64, neg.size)
+    else:
+        exp_neg = np.fromiter(map(math.exp, neg.tolist()), np.float64, neg.size)
+    return 1.0 / (1.0 + exp_neg)
+
+
+# =========================================================
+# 📐 LINEAR MODEL
+# =========================================================
+@dataclass(frozen=True)
+class LinearModel:
+    """Coefficients of a fitted binary LogisticRegression."""
+
+    name: str
+    coef: np.ndarray        # (1, n_features)
+    intercept: np.ndarray   # (1,)
+    classes: np.ndarray     # (2,)
+    features: tuple         # training feature order
+    version: str            # sha256 of the source .sav file
+
+    @property
+    def n_features(self):
+        return self.coef.shape[1]
+
+    @staticmethod
+    def unnamed_features(n_features):
+        """Feature names of an estimator fitted without column names."""
+        return tuple(f"x{i}" for i in range(n_features))
+
+    @classmethod
+    def from_estimator(cls, name, estimator, version=""):
+        features = getattr(estimator, "feature_names_in_", None)
+        if features is None:
+            features = cls.unnamed_features(estimator.coef_.shape[1])
+        return cls(
+            name=name,
+            coef=np.asarray(estimator.coef_, dtype=np.float64),
+            intercept=np.asarray(estimator.intercept_, dtype=np.float64),
+            classes=np.asarray(estimator.classes_),
+            features=tuple(str(f) for f in features),
+            version=version,
+        )
+
+    # -----------------------------------------------------
+    # Scoring (mirrors LinearClassifierMixin exactly)
+    # -----------------------------------------------------
+    def decision_function(self, X):
+        scores = X @ self.coef.T + self.intercept
+        return scores.reshape(-1)
+
+    def predict(self, X):
+        indices = (self.decision_function(X) > 0).astype(np.intp)
+        return np.take(self.classes, indices, axis=0)
+
+    def predict_proba(self, X, exact=True):
+        """``(n_rows, 2)`` class probabilities, ordered as ``classes``."""
+        prob = expit(self.decision_function(X), exact=exact)
+        return np.vstack([1 - prob, prob]).T
+
+    def score(self, X, exact=True):
+        """Labels and positive-class probabilities from one pass."""
+        scores = self.decision_function(X)
+        labels = np.take(self.classes, (scores > 0).astype(np.intp), axis=0)
+        return labels, expit(scores, exact=exact)
+
+
+# =========================================================
+# 💾 EXPORT / LOAD
+# =========================================================
+def file_version(path):
+    """Content hash identifying one ``.sav`` file."""
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def export_path(name):
+    return os.path.splitext(registry.path(name))[0] + ".npz"
+
+
+def export_model(name):
+    """Write the coefficients of model ``name`` to its ``.npz`` file."""
+    sav_path = registry.path(name)
+    model = LinearModel.from_estimator(
+        name, registry.get(name), version=file_version(sav_path)
+    )
+    path = export_path(name)
+    np.savez(
+        path,
+        coef=model.coef,
+        intercept=model.intercept,
+        classes=model.classes,
+        features=np.array(model.features),
+        version=np.array(model.version),
+    )
+    return path
+
+
+def load_export(name, path=None):
+    """Load a ``LinearModel`` from an ``.npz`` export (no sklearn needed)."""
+    with np.load(path or export_path(name), allow_pickle=False) as data:
+        return LinearModel(
+            name=name,
+            coef=data["coef"],
+            intercept=data["intercept"],
+            classes=data["classes"],
+            features=tuple(data["features"].tolist()),
+            version=str(data["version"]),
+        )
+
+
+# =========================================================
+# 🧠 ACTIVE MODELS (one LinearModel per model and process)
+# =========================================================
+_lock = threading.Lock()
+
+
+def _resolve(name):
+    # Circular at module level: the watcher scores through this engine
+    from model_watcher import validate
+
+    version = file_version(registry.path(name))
+    path = export_path(name)
+    exported = None
+    if os.path.exists(path):
+        start = time.perf_counter()
+        with metrics.stage(name, "load"):
+            exported = load_export(name, path)
+        if exported.version == version:
+            registry.record_load(name, path, time.perf_counter() - start, exported)
+            return exported
+    # Export missing or stale (e.g. after a hot swap): extract from the
+    # pickled estimator, which gets the watcher's checks first
+    estimator = registry.get(name)
+    problems = validate(name, estimator, current=exported)
+    if problems:
+        raise ValueError(
+            f"{registry.path(name)} failed validation: " + "; ".join(problems)
+        )
+    return LinearModel.from_estimator(name, estimator, version=version)
+
+
+def get_linear(name):
+    """Return the active ``LinearModel`` for ``name``, loading it on first use.
+
+    Callers scoring several steps with one model (e.g. a prediction and its
+    explanation) should fetch it once: the watcher may swap in a new
+    version at any time. Raises ``ValueError`` if the model file fails
+    the watcher's validation on first use.
+    """
+    active = registry.active(name)
+    if active is None:
+        with _lock:
+            active = registry.active(name) or registry.activate(name, _resolve(name))
+    return active.model
+
+
+# =========================================================
+# ✅ PARITY CHECK
+# =========================================================
+def parity_rows(n_features, n_rows, seed=0):
+    """Random rows on a wide log-uniform scale, so both tails of the
+    sigmoid (including exp overflow) are exercised."""
+    rng = np.random.default_rng(seed)
+    magnitude = 10.0 ** rng.uniform(-4, 3, size=(n_rows, n_features))
+    return magnitude * rng.choice([-1.0, 1.0], size=magnitude.shape)
+
+
+def matches_estimator(model, estimator, X):
+    """True if ``model`` and the sklearn ``estimator`` agree exactly on ``X``."""
+    with warnings.catch_warnings():
+        # Estimators were fitted on DataFrames; plain arrays are intended here
+        warnings.simplefilter("ignore", UserWarning)
+        expected_labels = estimator.predict(X)
+        expected_proba = estimator.predict_proba(X)
+
+    return (
+        np.array_equal(model.predict(X), expected_labels)
+        and np.array_equal(model.predict_proba(X), expected_proba)
+    )
+
+
+def check_parity(name, n_rows=100_000, seed=0):
+    """Score random rows with the engine and sklearn; True if identical."""
+    estimator = registry.get(name)
+    model = load_export(name) if os.path.exists(export_path(name)) else get_linear(name)
+    return matches_estimator(model, estimator, parity_rows(model.n_features, n_rows, seed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    ok = True
+    for name in registry.model_files:
+        if args.command == "export":
+            print(f"{name}: wrote {export_model(name)}")
+        else:
+            identical = check_parity(name, n_rows=args.rows)
+            ok &= identical
+            print(f"{name}: {'identical' if identical else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Load replay and load generation for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Drives the three predictors under concurrency for capacity planning,
+fully offline. Requests come from
+
+* the audit log (``requests.jsonl`` and its rotated ``.gz`` files), or
+* synthetic records drawn inside the ``number_input`` bounds of each form
+  (typical ranges of the UCI voice dataset for Parkinson's, whose form
+  has no bounds),
+
+and are sent at a configurable rate and concurrency (threads or asyncio)
+either to the in-process inference core or to a running HTTP service
+(see prediction_service.py; ``--start-server`` launches one locally).
+
+Throughput, latency percentiles and error rates are reported per model.
+With ``--rate``, latency is measured from each request's scheduled send
+time, so the time requests wait behind an overloaded target is counted
+(no coordinated omission).
+
+USAGE:
+------
+    python load_replay.py --synthesize 20000 --concurrency 8
+    python load_replay.py --log requests.jsonl --rate 500 --duration 30
+    python load_replay.py --synthesize 5000 --start-server --mode asyncio
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+# Replayed traffic must not be appended to the log it is read from
+os.environ.setdefault("MDPS_AUDIT_LOG", "")
+
+from schema import PARKINSONS_RANGES, SCHEMAS  # noqa: E402
+
+
+# =========================================================
+# 🧾 REQUEST SOURCES
+# =========================================================
+def read_log(path, limit=None):
+    """Yield ``(model, inputs)`` from an audit log (plain or gzipped).
+
+    Lines that are not prediction records are skipped.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    count = 0
+    with opener(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            model = record.get("model") if isinstance(record, dict) else None
+            inputs = record.get("inputs") if model else None
+            if model not in SCHEMAS or not isinstance(inputs, dict):
+                continue
+            if any(k not in inputs for k in SCHEMAS[model].keys):
+                continue
+            yield model, inputs
+            count += 1
+            if limit and count >= limit:
+                return
+
+
+def _draw(rng, name):
+    inputs = {}
+    for f in SCHEMAS[name].features:
+        if name == "parkinsons":
+            lo, hi = PARKINSONS_RANGES[f.key]
+        else:
+            lo, hi = f.min_value, f.max_value
+        value = rng.uniform(lo, hi)
+        inputs[f.key] = int(round(value)) if f.dtype is int else value
+    return inputs
+
+
+def synthesize(n, models=None, invalid_fraction=0.0, seed=0):
+    """``n`` random ``(model, inputs)`` records within the form bounds.
+
+    Records breaking the schema's warning rules are redrawn, except for
+    roughly ``invalid_fraction`` of them, kept to exercise the error path.
+    """
+    rng = random.Random(seed)
+    models = list(models or SCHEMAS)
+    for _ in range(n):
+        name = rng.choice(models)
+        inputs = _draw(rng, name)
+        if rng.random() >= invalid_fraction:
+            while SCHEMAS[name].validate_row(inputs):
+                inputs = _draw(rng, name)
+        yield name, inputs
+
+
+# =========================================================
+# 🎯 TARGETS
+# =========================================================
+def inprocess_call(model, inputs, use_cache):
+    import inference
+
+    errors = SCHEMAS[model].validate_row(inputs)
+    if errors:
+        return "invalid"
+    inference.score(model, inference.row_from_mapping(model, inputs),
+                    use_cache=use_cache, source="replay")
+    return "ok"
+
+
+def http_call(base_url, model, inputs, timeout=10.0):
+    request = urllib.request.Request(
+        f"{base_url}/predict/{model}",
+        data=json.dumps(inputs).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return "ok"
+    except urllib.error.HTTPError as exc:
+        return {422: "invalid", 503: "rejected"}.get(exc.code, f"http_{exc.code}")
+    except (urllib.error.URLError, OSError):
+        return "connection_error"
+
+
+# =========================================================
+# 📊 RESULTS
+# =========================================================
+class Results:
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def add(self, model, outcome, seconds):
+        with self._lock:
+            self.outcomes[model][outcome] += 1
+            if outcome == "ok":
+                self.latencies[model].append(seconds)
+
+    def report(self, elapsed):
+        report = {}
+        for model in sorted(self.outcomes):
+            outcomes = dict(self.outcomes[model])
+            total = sum(outcomes.values())
+            ms = np.asarray(self.latencies[model]) * 1000
+            p = np.percentile(ms, [50, 95, 99]).tolist() if ms.size else [0.0] * 3
+            report[model] = {
+                "requests": total,
+                "throughput_rps": total / elapsed if elapsed else 0.0,
+                "error_rate": 1 - outcomes.get("ok", 0) / total if total else 0.0,
+                "outcomes": outcomes,
+                "p50_ms": p[0],
+                "p95_ms": p[1],
+                "p99_ms": p[2],
+            }
+        return report
+
+
+# =========================================================
+# 🚦 DRIVERS
+# =========================================================
+def _schedule(records, rate, duration):
+    """Yield ``(due_time, model, inputs)``; loops records for ``duration``."""
+    start = time.perf_counter()
+    interval = 1.0 / rate if rate else 0.0
+    i = 0
+    while True:
+        for model, inputs in records:
+            due = start + i * interval
+            # Without a rate, ``due`` never advances: use the wall clock
+            if duration and max(due, time.perf_counter()) - start >= duration:
+                return
+            yield due, model, inputs
+            i += 1
+        if not duration or not records:
+            return
+
+
+def run_threads(records, call, concurrency, rate, duration):
+    results = Results()
+
+    def worker(item):
+        due, model, inputs = item
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # With a rate, count the time spent queued behind the target
+        start = due if rate else time.perf_counter()
+        try:
+            outcome = call(model, inputs)
+        except Exception:
+            outcome = "exception"
+        results.add(model, outcome, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        # Bounded submission keeps memory flat for long runs
+        pending = set()
+        for item in _schedule(records, rate, duration):
+            pending.add(pool.submit(worker, item))
+            if len(pending) >= concurrency * 4:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+    return results, time.perf_counter() - start
+
+
+async def _run_async(records, call, concurrency, rate, duration):
+    results = Results()
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    tasks = set()
+
+    async def one(due, model, inputs):
+        async with semaphore:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # With a rate, count the time spent queued behind the target
+            start = due if rate else time.perf_counter()
+            try:
+                outcome = await loop.run_in_executor(None, call, model, inputs)
+            except Exception:
+                outcome = "exception"
+            results.add(model, outcome, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for item in _schedule(records, rate, duration):
+        task = asyncio.ensure_future(one(*item))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        if len(tasks) >= concurrency * 4:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    if tasks:
+        await asyncio.wait(tasks)
+    return results, time.perf_counter() - start
+
+
+def run_asyncio(records, call, concurrency, rate, duration):
+    from concurrent.futures import ThreadPoolExecutor as Executor
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(Executor(concurrency))
+        return await _run_async(records, call, concurrency, rate, duration)
+
+    return asyncio.run(main())
+
+
+# =========================================================
+# 🚀 LOCAL SERVER
+# =========================================================
+def start_server(port, extra_args=()):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "prediction_service.py")
+    process = subprocess.Popen(
+        [sys.executable, script, "--port", str(port), *extra_args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("prediction service did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Health Predictor load replay")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--log", help="audit log to replay (.jsonl or .jsonl.gz)")
+    source.add_argument("--synthesize", type=int, metavar="N",
+                        help="generate N synthetic records")
+    parser.add_argument("--models", nargs="*", choices=sorted(SCHEMAS))
+    parser.add_argument("--invalid-fraction", type=float, default=0.0,
+                        help="share of synthetic records left invalid")
+    parser.add_argument("--limit", type=int, help="max records read from --log")
+    parser.add_argument("--target", default="inprocess",
+                        help="'inprocess' or a service base URL")
+    parser.add_argument("--start-server", action="store_true",
+                        help="start prediction_service.py locally and target it")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="requests per second (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="seconds to run, looping the records (0 = one pass)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the prediction cache (in-process target)")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    if args.log:
+        records = [r for r in read_log(args.log, args.limit)
+                   if not args.models or r[0] in args.models]
+    else:
+        records = list(synthesize(args.synthesize, args.models,
+                                  args.invalid_fraction))
+    if not records:
+        parser.error("no prediction records to replay")
+
+    server = None
+    if args.start_server:
+        server = start_server(args.port)
+        args.target = f"http://127.0.0.1:{args.port}"
+
+    try:
+        if args.target == "inprocess":
+            def call(model, inputs):
+                return inprocess_call(model, inputs, not args.no_cache)
+        else:
+            base_url = args.target.rstrip("/")
+
+            def call(model, inputs):
+                return http_call(base_url, model, inputs)
+
+        runner = run_threads if args.mode == "threads" else run_asyncio
+        results, elapsed = runner(records, call, args.concurrency,
+                                  args.rate, args.duration)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "target": args.target,
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "elapsed_s": elapsed,
+        "models": results.report(elapsed),
+    }
+    for model, r in report["models"].items():
+        print(
+            f"{model:11s} {r['requests']:8d} req  {r['throughput_rps']:10.1f} req/s  "
+            f"p50 {r['p50_ms']:7.3f} ms  p95 {r['p95_ms']:7.3f} ms  "
+            f"p99 {r['p99_ms']:7.3f} ms  errors {r['error_rate']:.2%}"
+        )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
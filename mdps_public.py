@@ -11,20 +11,57 @@ Health Predictor Web App using Machine Learning
 FRAMEWORK:
 ----------
 Streamlit + Pickle Models
+
+STRUCTURE:
+----------
+This script is the entry point: it draws the sidebar and hands over to
+the selected page module in ``app_pages/`` (Streamlit multipage
+navigation). Each page imports its own dependencies on first use, and
+its form and result area run as a fragment, so a form submit reruns
+only that region.
 """
 # =========================================================
 # 📦 IMPORTS
 # =========================================================
-import pickle
+import time
+
 import streamlit as st
-from streamlit_option_menu import option_menu
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import form_store
+import metrics
 
 # =========================================================
-# 🧠 LOAD ML MODELS
+# 🧠 ML MODELS
 # =========================================================
-diabetes_model = pickle.load(open("diabetes_model.sav", "rb"))
-heart_disease_model = pickle.load(open("heart_disease_model.sav", "rb"))
-parkinsons_model = pickle.load(open("parkinsons_model.sav", "rb"))
+# Models are loaded lazily, once per server process, by the shared
+# registry (see model_registry.py) on the first prediction of a page.
+# All scoring goes through the headless inference core (inference.py).
+# Retrained model files are validated and swapped in by the background
+# watcher (model_watcher.py), without restarting the server.
+import model_watcher
+from model_registry import registry
+
+model_watcher.start()
+
+# =========================================================
+# 🧭 PAGES
+# =========================================================
+pages = [
+    st.Page("app_pages/diabetes.py", title="Diabetes Prediction",
+            icon=":material/water_drop:", default=True),
+    st.Page("app_pages/heart.py", title="Heart Disease Prediction",
+            icon=":material/favorite:"),
+    st.Page("app_pages/parkinsons.py", title="Parkinsons Prediction",
+            icon=":material/record_voice_over:"),
+    st.Page("app_pages/screen.py", title="Full Health Screen",
+            icon=":material/health_and_safety:"),
+]
+# The menu is drawn below the sidebar header (st.page_link), not by
+# Streamlit's default navigation widget
+selected = st.navigation(pages, position="hidden")
+
+
 # =========================================================
 # 📚 SIDEBAR
 # =========================================================
@@ -45,18 +82,76 @@ with st.sidebar:
     st.divider() 
 
     #---------- Sidebar Menu Section ----------
-    selected = option_menu(
-        "Select Prediction",
-        ["Diabetes Prediction", "Heart Disease Prediction", "Parkinsons Prediction"],
-        icons=[
-            "droplet-half",      # Diabetes
-            "heart-fill",        # Heart
-            "person-lines-fill"  # Parkinson's
-        ],
-        default_index=0,
-    )
+    st.markdown("**Select Prediction**")
+    for page in pages:
+        st.page_link(page)
     st.divider()    
 
+    #---------- Loaded Models Section ----------
+    model_stats = registry.stats()
+    if model_stats:
+        # Models are only loaded by a page that scored, which has
+        # already imported the inference core
+        import inference
+
+        with st.expander("⚙️ Loaded Models"):
+            for info in model_stats.values():
+                active = registry.active(info.name)
+                version = f", version `{active.version[:12]}`" if active else ""
+                st.caption(
+                    f"**{info.name}** — loaded in {info.load_seconds * 1000:.1f} ms, "
+                    f"{info.memory_bytes / 1024:.1f} KiB in memory{version}"
+                )
+            cache_stats = inference.cache.stats()
+            st.caption(
+                f"**cache** — {cache_stats['entries']:,} entries, "
+                f"{cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses"
+            )
+
+    #---------- Admin Panel (MDPS_METRICS=1) ----------
+    if metrics.metrics.enabled:
+        with st.expander("📈 Performance (live)"):
+            stage_rows = metrics.metrics.summary()
+            if stage_rows:
+                st.dataframe(stage_rows, hide_index=True)
+            else:
+                st.caption("No predictions timed yet.")
+            # Form values of all sessions (form_store.py), and this session's share
+            form_stats = form_store.stats()
+            st.caption(
+                f"**forms** — {form_stats['sessions']:,} sessions, "
+                f"{form_stats['bytes'] / 1024:.1f} KiB allocated; this session "
+                f"{form_store.usage(get_script_run_ctx().session_id):,} bytes"
+            )
+
+        with st.expander("🔁 Model Versions"):
+            for name in registry.model_files:
+                active = registry.active(name)
+                if active is None:
+                    continue
+                st.caption(
+                    f"**{name}** — serving `{active.version[:12]}` since "
+                    f"{time.strftime('%H:%M:%S', time.localtime(active.activated_at))}"
+                )
+                previous = [entry.version for entry in registry.history(name)]
+                if previous:
+                    target = st.selectbox(
+                        "Previous versions", previous, key=f"rollback_{name}_version",
+                        format_func=lambda v: v[:12], label_visibility="collapsed",
+                    )
+                    st.button(
+                        "↩️ Roll back", key=f"rollback_{name}",
+                        on_click=registry.rollback, args=(name, target),
+                    )
+            # Latest rejected model files (copied: the watcher appends concurrently)
+            watcher = model_watcher.watcher()
+            events = list(watcher.events) if watcher else []
+            for event in [e for e in reversed(events) if not e.accepted][:5]:
+                version = f" `{event.version[:12]}`" if event.version else ""
+                st.caption(
+                    f"⚠️ Rejected {event.name}{version}: " + "; ".join(event.problems)
+                )
+
     #---------- Sidebar Footer Section ----------
     st.markdown(
         """
@@ -83,435 +178,7 @@ with st.sidebar:
 #------------ Mmain Content Section  Start--------------------
 st.markdown('<div class="main-content">', unsafe_allow_html=True)
 
-# =========================================================
-# 🩸 DIABETES PREDICTION MODULE
-# =========================================================
-if (selected == 'Diabetes Prediction'):     
-    # -----------------------------------------------------
-    # 1️⃣ SESSION STATE INITIALIZATION (Default Values)
-    # -----------------------------------------------------
-    # These defaults ensure the form retains values
-    # and can be reset or auto-filled safely
-    defaults = {
-        "Pregnancies": 0, "Glucose": 0, "BloodPressure": 0,
-        "SkinThickness": 0, "Insulin": 0,  "BMI": 0.0,
-        "DPF": 0.0,  "Age": 1
-    }
-
-    # Initialize session state keys if not already present
-    for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
-    
-    # -----------------------------------------------------
-    # 2️⃣ CLEAR FORM FUNCTION
-    # -----------------------------------------------------
-    # Resets all input fields back to default values
-    def clear_form():
-        for key, value in defaults.items():
-            st.session_state[key] = value
-   
-    # -----------------------------------------------------
-    # 5️⃣ PAGE HEADER & ACTION BUTTONS
-    # -----------------------------------------------------
-    col_title, col_btn1, col_btn2 = st.columns([4, 1, 1])
-
-    with col_title:
-        st.header("🩸 Diabetes Prediction", divider="blue")
-
-    with col_btn1:
-        st.markdown("<br>", unsafe_allow_html=True)
-           
-    with col_btn2:    
-         st.markdown("<br>", unsafe_allow_html=True)
-       # st.button("🧹 Clear", type="secondary", on_click=clear_form)
-
-   
-    # -----------------------------------------------------
-    # 7️⃣ DIABETES INPUT FORM
-    # -----------------------------------------------------
-    with st.form("diabetes_form"):
-
-        # --- Row 1 ---
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            Pregnancies = st.number_input(
-                "Number of Pregnancies", 0, 20, key="Pregnancies"
-            )
-        with col2:
-            Glucose = st.number_input(
-                "Glucose Level (mg/dL)", 0, 300, key="Glucose"
-            )
-        with col3:
-            BloodPressure = st.number_input(
-                "Blood Pressure (mm Hg)", 0, 200, key="BloodPressure"
-            )
-
-        # --- Row 2 ---
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            SkinThickness = st.number_input(
-                "Skin Thickness (mm)", 0, 100, key="SkinThickness"
-            )
-        with col2:
-            Insulin = st.number_input(
-                "Insulin Level (µU/mL)", 0, 900, key="Insulin"
-            )
-        with col3:
-            BMI = st.number_input(
-                "BMI", 0.0, 70.0, format="%.2f", key="BMI"
-            )
-
-        # --- Row 3 ---
-        col1, col2 = st.columns(2)
-        with col1:
-            DPF = st.number_input(
-                "Diabetes Pedigree Function", 0.0, 3.0, format="%.3f", key="DPF"
-            )
-        with col2:
-            Age = st.number_input(
-                "Age", 1, 120, key="Age"
-            )
-    
-        # -------------------------------------------------
-        # 8️⃣ PREDICTION BUTTON
-        # -------------------------------------------------
-        col1, col2 = st.columns(2)
-        with col1:
-            predict_btn = st.form_submit_button("🔍 Diabetes Test Result", type="primary")        
-
-    # -----------------------------------------------------
-    # 9️⃣ DIABETES PREDICTION & VALIDATION
-    # -----------------------------------------------------
-    if predict_btn:
-        
-        # -------------------------------------------------
-        # 9.1️⃣ BASIC INPUT VALIDATION
-        # -------------------------------------------------
-        # Collects warnings for unrealistic or unsafe inputs
-        errors = []
-    
-        if Glucose < 70:
-            errors.append("⚠️ Glucose level seems too low.")
-        if BloodPressure < 40:
-            errors.append("⚠️ Blood Pressure seems too low.")
-        if BMI < 10:
-            errors.append("⚠️ BMI value seems invalid.")
-        if Age < 10:
-            errors.append("⚠️ Age must be at least 10 years.")
-
-        # Display validation errors (if any)
-        if errors:
-            st.error("Please correct the following:")
-            for err in errors:
-                st.write(err)
-        # -------------------------------------------------
-        # 9.2️⃣ MODEL PREDICTION
-        # -------------------------------------------------
-        else:
-            # Predict diabetes outcome (0 = No, 1 = Yes)
-            diab_prediction = diabetes_model.predict([[
-                Pregnancies, Glucose, BloodPressure,
-                SkinThickness, Insulin, BMI, DPF, Age
-            ]])
-
-            # Display prediction result
-            if diab_prediction[0] == 1:
-                st.error("🔴 The person is Diabetic")
-            else:
-                st.success("🟢 The person is not Diabetic")         
-                
-
-# =========================================================
-# ❤️ HEART DISEASE PREDICTION MODULE
-# =========================================================
-if selected == 'Heart Disease Prediction':
-
-    # -----------------------------------------------------
-    # 1️⃣ SESSION STATE DEFAULT VALUES
-    # -----------------------------------------------------
-    # Default values ensure form persistence and reset safety
-    heart_defaults = {
-        "age": 1, "sex": 0, "cp": 0, "trestbps": 80,  
-        "chol": 100, "fbs": 0, "restecg": 0, "thalach": 60, 
-        "exang": 0, "oldpeak": 0.0, "slope": 0, "ca": 0, "thal": 0
-    }
+selected.run()
 
-    # Initialize session state
-    for k, v in heart_defaults.items():
-        if k not in st.session_state:
-            st.session_state[k] = v
-            
-    # -----------------------------------------------------
-    # 2️⃣ CLEAR FORM FUNCTION
-    # -----------------------------------------------------
-    # Resets all heart disease inputs to default values
-    def clear_heart_form():
-        for k, v in heart_defaults.items():
-            st.session_state[k] = v
-     
-
-    # -----------------------------------------------------
-    # 5️⃣ PAGE HEADER & ACTION BUTTONS
-    # -----------------------------------------------------
-    col_title, col_btn1, col_btn2 = st.columns([4, 1, 1])
-
-    with col_title:
-        st.header("❤️ Heart Disease Prediction", divider="red")
-    
-    with col_btn1:
-        st.markdown("<br>", unsafe_allow_html=True)
-            
-    with col_btn2:
-         st.markdown("<br>", unsafe_allow_html=True)
-        #st.button("🧹 Clear", on_click=clear_heart_form)
-
-  
-    # -----------------------------------------------------
-    # 7️⃣ HEART DISEASE INPUT FORM
-    # -----------------------------------------------------
-    with st.form("heart_form"):
-
-        # --- Row 1 ---
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            age = st.number_input('Age', 1, 120, key="age")
-        with col2:
-            sex = st.number_input('Sex (1 = Male, 0 = Female)', 0, 1, key="sex")
-        with col3:
-            cp = st.number_input('Chest Pain Type (0–3)', 0, 3, key="cp")
-
-        # --- Row 2 ---
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            trestbps = st.number_input('Resting Blood Pressure', 80, 200, key="trestbps")
-        with col2:
-            chol = st.number_input('Serum Cholesterol', 100, 600, key="chol")
-        with col3:
-            fbs = st.number_input('Fasting Blood Sugar > 120', 0, 1, key="fbs")
-
-        # --- Row 3 ---
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            restecg = st.number_input('Resting ECG (0–2)', 0, 2, key="restecg")
-        with col2:
-            thalach = st.number_input('Max Heart Rate', 60, 250, key="thalach")
-        with col3:
-            exang = st.number_input('Exercise Induced Angina', 0, 1, key="exang")
-
-        # --- Row 4 ---
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            oldpeak = st.number_input('ST Depression', 0.0, 10.0, key="oldpeak")
-        with col2:
-            slope = st.number_input('Slope (0–2)', 0, 2, key="slope")
-        with col3:
-            ca = st.number_input('Major Vessels', 0, 4, key="ca")
-
-        thal = st.number_input('Thal (0–2)', 0, 2, key="thal")
-
-        predict_btn = st.form_submit_button("🔍 Heart Disease Test Result", type="primary")
-
-    # -----------------------------------------------------
-    # 8️⃣ PREDICTION & VALIDATION
-    # -----------------------------------------------------
-    if predict_btn:
-
-        # --- Input Validation ---
-        errors = []
-
-        if age < 10:
-            errors.append("⚠️ Age must be at least 10 years.")
-        if trestbps < 80 or trestbps > 200:
-            errors.append("⚠️ Resting BP must be 80–200 mm Hg.")
-        if chol < 100 or chol > 600:
-            errors.append("⚠️ Cholesterol must be 100–600.")
-        if thalach < 60 or thalach > 250:
-            errors.append("⚠️ Max heart rate must be 60–250.")
-        if ca < 0 or ca > 4:
-            errors.append("⚠️ Major vessels must be 0–4.")
-
-        # Display validation errors
-        if errors:
-            st.error("Please correct the following:")
-            for e in errors:
-                st.write(e)
-        # -------------------------------------------------
-        # 9️⃣ MODEL INFERENCE & RISK ANALYSIS
-        # -------------------------------------------------
-        else:
-            input_data = [[
-                age, sex, cp, trestbps, chol, fbs,
-                restecg, thalach, exang, oldpeak,
-                slope, ca, thal
-            ]]
-
-            prediction = heart_disease_model.predict(input_data)
-
-            # -------------------------------------------------
-            # 🔟 RESULT DISPLAY
-            # -------------------------------------------------
-            if prediction[0] == 1:
-                st.error("🔴 Heart Disease Detected")
-            else:
-                st.success("🟢 No Heart Disease Detected")
-        
-
-# =========================================================
-# 🧠 PARKINSON’S DISEASE PREDICTION MODULE
-# =========================================================
-if (selected == 'Parkinsons Prediction'):
-    
-    # -----------------------------------------------------
-    # 1️⃣ SESSION STATE DEFAULT VALUES
-    # -----------------------------------------------------
-    # Default initialization for all Parkinson's voice features
-    parkinsons_defaults = {
-        "fo": 0.0, "fhi": 0.0, "flo": 0.0,
-        "Jitter_percent": 0.0, "Jitter_Abs": 0.0,
-        "RAP": 0.0, "PPQ": 0.0, "DDP": 0.0,
-        "Shimmer": 0.0, "Shimmer_dB": 0.0,
-        "APQ3": 0.0, "APQ5": 0.0, "APQ": 0.0, "DDA": 0.0,
-        "NHR": 0.0, "HNR": 0.0,
-        "RPDE": 0.0, "DFA": 0.0,
-        "spread1": 0.0, "spread2": 0.0,
-        "D2": 0.0, "PPE": 0.0
-    }
-
-    # Initialize session state keys
-    for key, val in parkinsons_defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = val
-
-    # -----------------------------------------------------
-    # 2️⃣ CLEAR FORM FUNCTION
-    # -----------------------------------------------------
-    def clear_parkinsons_form():
-        for key, val in parkinsons_defaults.items():
-            st.session_state[key] = val
-
-    # -----------------------------------------------------
-    # 5️⃣ PAGE HEADER & CLEAR BUTTON
-    # -----------------------------------------------------
-    col_title, col_btn1, col_btn2 = st.columns([4, 1, 1])
-    
-    with col_title:
-        st.header("🧠 Parkinson’s Prediction", divider="violet")
-
-    with col_btn1:
-        st.markdown("<br>", unsafe_allow_html=True)
-
-    with col_btn2:
-         st.markdown("<br>", unsafe_allow_html=True)
-       # st.button("🧹 Clear", type="secondary", on_click=clear_parkinsons_form)
-
-    
-
-    # -----------------------------------------------------
-    # 7️⃣ PARKINSON’S INPUT FORM      
-    # -----------------------------------------------------
-    with st.form("parkinsons_form"):
-
-        # --- Frequency & Jitter Metrics ---
-        cols = st.columns(5)
-        with cols[0]: fo = st.number_input("MDVP:Fo(Hz)", step=0.001, format="%.3f", key="fo")
-        with cols[1]: fhi = st.number_input("MDVP:Fhi(Hz)", step=0.001, format="%.3f", key="fhi")
-        with cols[2]: flo = st.number_input("MDVP:Flo(Hz)", step=0.001, format="%.3f", key="flo")
-        with cols[3]: Jitter_percent = st.number_input("MDVP:Jitter(%)", step=0.00001, format="%.5f", key="Jitter_percent")
-        with cols[4]: Jitter_Abs = st.number_input("MDVP:Jitter(Abs)", step=0.00001, format="%.5f", key="Jitter_Abs")
-
-        # --- Jitter & Shimmer Features ---
-        cols = st.columns(5)
-        with cols[0]: RAP = st.number_input("MDVP:RAP", step=0.00001, format="%.5f", key="RAP")
-        with cols[1]: PPQ = st.number_input("MDVP:PPQ", step=0.00001, format="%.5f", key="PPQ")
-        with cols[2]: DDP = st.number_input("Jitter:DDP", step=0.00001, format="%.5f", key="DDP")
-        with cols[3]: Shimmer = st.number_input("MDVP:Shimmer", step=0.00001, format="%.5f", key="Shimmer")
-        with cols[4]: Shimmer_dB = st.number_input("MDVP:Shimmer(dB)", step=0.001, format="%.3f", key="Shimmer_dB")
-
-        # --- Amplitude Perturbation Measures ---
-        cols = st.columns(5)
-        with cols[0]: APQ3 = st.number_input("Shimmer:APQ3", step=0.00001, format="%.5f", key="APQ3")
-        with cols[1]: APQ5 = st.number_input("Shimmer:APQ5", step=0.00001, format="%.5f", key="APQ5")
-        with cols[2]: APQ = st.number_input("MDVP:APQ", step=0.00001, format="%.5f", key="APQ")
-        with cols[3]: DDA = st.number_input("Shimmer:DDA", step=0.00001, format="%.5f", key="DDA")
-        with cols[4]: NHR = st.number_input("NHR", step=0.00001, format="%.5f", key="NHR")
-
-        # --- Noise & Nonlinear Measures ---
-        cols = st.columns(5)
-        with cols[0]: HNR = st.number_input("HNR", step=0.001, format="%.3f", key="HNR")
-        with cols[1]: RPDE = st.number_input("RPDE", step=0.00001, format="%.6f", key="RPDE")
-        with cols[2]: DFA = st.number_input("DFA", step=0.00001, format="%.6f", key="DFA")
-        with cols[3]: spread1 = st.number_input("spread1", step=0.00001, format="%.6f", key="spread1")
-        with cols[4]: spread2 = st.number_input("spread2", step=0.00001, format="%.6f", key="spread2")
-
-        # --- Complexity Measures ---
-        cols = st.columns(2)
-        with cols[0]: D2 = st.number_input("D2", step=0.00001, format="%.6f", key="D2")
-        with cols[1]: PPE = st.number_input("PPE", step=0.00001, format="%.6f", key="PPE")
-
-        predict_btn = st.form_submit_button("🔍 Parkinson's Test Result", type="primary")
-
-    # -----------------------------------------------------
-    # 8️⃣ INPUT VALIDATION & ERROR HANDLING
-    # -----------------------------------------------------
-    if predict_btn:
-
-        errors = []
-    
-        # Basic numeric sanity checks
-        if fo <= 0 or fhi <= 0 or flo <= 0:
-            errors.append("⚠️ Frequency values (Fo, Fhi, Flo) must be greater than 0.")
-    
-        if Jitter_percent < 0 or Shimmer < 0:
-            errors.append("⚠️ Jitter and Shimmer values cannot be negative.")
-    
-        if HNR <= 0:
-            errors.append("⚠️ HNR must be greater than 0.")
-    
-        if D2 <= 0 or PPE <= 0:
-            errors.append("⚠️ D2 and PPE must be greater than 0.")
-    
-        # Prevent meaningless all-zero input
-        all_inputs = [
-            fo, fhi, flo, Jitter_percent, Jitter_Abs, RAP, PPQ, DDP,
-            Shimmer, Shimmer_dB, APQ3, APQ5, APQ, DDA,
-            NHR, HNR, RPDE, DFA, spread1, spread2, D2, PPE
-        ]
-    
-        if all(value == 0 for value in all_inputs):
-            errors.append("⚠️ Please enter valid data. All values cannot be zero.")
-    
-        # -------------------------------------------------
-        # 9️⃣ DISPLAY ERRORS OR PERFORM PREDICTION
-        # -------------------------------------------------
-        if errors:
-            st.error("Please fix the following issues before prediction:")
-            for err in errors:
-                st.write(err)
-    
-        # --------- Prediction ----------
-        else:
-            input_data = [[
-                fo, fhi, flo, Jitter_percent, Jitter_Abs,
-                RAP, PPQ, DDP, Shimmer, Shimmer_dB,
-                APQ3, APQ5, APQ, DDA, NHR, HNR,
-                RPDE, DFA, spread1, spread2, D2, PPE
-            ]]
-    
-            prediction = parkinsons_model.predict(input_data)
-
-            # -------------------------------------------------
-            # 🔟 RESULT DISPLAY
-            # -------------------------------------------------
-            if prediction[0] == 1:
-                st.error("🔴 Parkinson’s Disease Detected")
-            else:
-                st.success("🟢 No Parkinson’s Disease Detected")
-           
 #------------ Mmain Content Section End--------------------    
 st.markdown('</div>', unsafe_allow_html=True)
-
-
-
-
-
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight hot-path instrumentation for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Times each stage of a prediction (model loading, session-state init,
+form rendering, validation, scoring, result rendering) per model, keeps
+in-process histograms and counters, and exports them in the Prometheus
+text format, to a file or from a small local HTTP endpoint.
+
+Instrumentation is off unless ``MDPS_METRICS=1`` is set (or ``enable()``
+is called). While disabled, ``stage()`` returns a shared no-op context
+manager, so the overhead is one attribute check per stage.
+
+USAGE:
+------
+    with metrics.stage("heart", "validate"):
+        errors = HEART.validate_row(values)
+
+    MDPS_METRICS=1 MDPS_METRICS_PORT=9100 streamlit run mdps_public.py
+    curl localhost:9100/metrics
+
+    # or dump to a file every 15 s (e.g. for node_exporter's textfile collector)
+    MDPS_METRICS=1 MDPS_METRICS_FILE=/var/lib/mdps/mdps.prom streamlit run mdps_public.py
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import bisect
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Upper bounds (seconds) of the histogram buckets
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+# Recent samples kept per histogram for live percentiles
+RESERVOIR_SIZE = 2048
+
+_NULL = contextlib.nullcontext()
+
+
+# =========================================================
+# 📊 HISTOGRAM
+# =========================================================
+class Histogram:
+    """Bucketed latency histogram plus a window of recent samples."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+            self.sum += seconds
+            self.count += 1
+            self.recent.append(seconds)
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """Percentiles (seconds) over the recent samples window."""
+        with self._lock:
+            samples = list(self.recent)
+        if not samples:
+            return {q: 0.0 for q in qs}
+        values = np.percentile(samples, qs)
+        return dict(zip(qs, values.tolist()))
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+# =========================================================
+# 🗂️ METRICS STORE
+# =========================================================
+class Metrics:
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, model, stage_name):
+        key = (model, stage_name)
+        hist = self.histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(key, Histogram())
+        return hist
+
+    def stage(self, model, stage_name):
+        """Context manager timing one stage of one model."""
+        if not self.enabled:
+            return _NULL
+        return _StageTimer(self.histogram(model, stage_name))
+
+    def inc(self, name, model, amount=1):
+        """Add ``amount`` to counter ``name`` of ``model``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (name, model)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    # -----------------------------------------------------
+    # Summaries & export
+    # -----------------------------------------------------
+    def summary(self):
+        """Rows of count / p50 / p95 / p99 (ms) per model and stage."""
+        rows = []
+        for (model, stage_name), hist in sorted(self.histograms.items()):
+            p = hist.percentiles()
+            rows.append({
+                "model": model,
+                "stage": stage_name,
+                "count": hist.count,
+                "p50_ms": p[50] * 1000,
+                "p95_ms": p[95] * 1000,
+                "p99_ms": p[99] * 1000,
+            })
+        return rows
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP mdps_stage_seconds Time spent in each prediction stage.",
+            "# TYPE mdps_stage_seconds histogram",
+        ]
+        for (model, stage_name), hist in sorted(self.histograms.items()):
+            labels = f'model="{model}",stage="{stage_name}"'
+            with hist._lock:
+                counts, total, count = list(hist.counts), hist.sum, hist.count
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'mdps_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"mdps_stage_seconds_sum{{{labels}}} {total!r}")
+            lines.append(f"mdps_stage_seconds_count{{{labels}}} {count}")
+
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            lines.append(f"# TYPE mdps_{name}_total counter")
+            for (counter, model), value in sorted(self.counters.items()):
+                if counter == name:
+                    lines.append(f'mdps_{name}_total{{model="{model}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text to ``path`` (atomic replace)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+
+# Shared by every session and thread of the server process
+metrics = Metrics(enabled=os.environ.get("MDPS_METRICS", "") not in ("", "0"))
+stage = metrics.stage
+inc = metrics.inc
+
+
+def enable(flag=True):
+    metrics.enabled = flag
+
+
+# =========================================================
+# 🌐 LOCAL /metrics ENDPOINT
+# =========================================================
+_server = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Start the ``/metrics`` endpoint in a daemon thread (once)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True,
+                             name="mdps-metrics").start()
+    return _server
+
+
+def write_periodically(path, interval=15.0):
+    """Rewrite the Prometheus file ``path`` every ``interval`` seconds."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            metrics.write_prometheus(path)
+
+    threading.Thread(target=loop, daemon=True, name="mdps-metrics-file").start()
+
+
+if metrics.enabled and os.environ.get("MDPS_METRICS_PORT"):
+    serve(int(os.environ["MDPS_METRICS_PORT"]))
+if metrics.enabled and os.environ.get("MDPS_METRICS_FILE"):
+    write_periodically(os.environ["MDPS_METRICS_FILE"])
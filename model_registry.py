@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide model registry for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Streamlit re-executes ``mdps_public.py`` on every widget change and form
+submit. Loading the pickled models at the top of the script therefore
+unpickled all three LogisticRegression models on every interaction.
+
+The registry defined here lives at module level, so it is shared by every
+Streamlit session and thread of the server process. Each model is loaded
+lazily the first time it is requested, exactly once, with the file closed
+properly, and its load time and memory footprint are recorded.
+
+When a ``.sav`` file changes on disk (new modification time or size) the
+next ``get`` reloads it.
+
+SERVING VERSIONS:
+-----------------
+Predictions are served from the *active version* of each model (a
+``linear_engine.LinearModel``). A new version replaces it in one
+reference assignment (``activate``): predictions already running finish
+on the version they started with, and readers never take a lock. The
+model watcher (model_watcher.py) activates new ``.sav`` files once they
+pass validation. The last ``MDPS_MODEL_KEEP`` (default 3) replaced
+versions of each model stay in memory for an instant ``rollback``.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+
+import metrics
+
+# =========================================================
+# 📁 MODEL FILES
+# =========================================================
+MODEL_DIR = os.environ.get("MDPS_MODEL_DIR") or os.path.dirname(os.path.abspath(__file__))
+
+MODEL_FILES = {
+    "diabetes": "diabetes_model.sav",
+    "heart": "heart_disease_model.sav",
+    "parkinsons": "parkinsons_model.sav",
+}
+
+# Replaced versions of each model kept for rollback
+DEFAULT_KEEP = int(os.environ.get("MDPS_MODEL_KEEP", 3))
+
+
+# =========================================================
+# 📊 LOAD STATISTICS
+# =========================================================
+@dataclass
+class ModelStats:
+    """Load time and memory footprint of one loaded model."""
+
+    name: str
+    path: str
+    load_seconds: float
+    file_bytes: int
+    memory_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """One version of a model that predictions can be served from."""
+
+    name: str
+    version: str            # sha256 of the source .sav file
+    model: object           # the scoring model (linear_engine.LinearModel)
+    activated_at: float = field(default_factory=time.time)
+
+
+def _estimate_memory(obj):
+    """Approximate in-memory size of a fitted estimator.
+
+    Sums the NumPy buffers held by the estimator (``coef_``,
+    ``intercept_``, ``classes_``, ...) plus the shallow size of the
+    object and its attribute dictionary.
+    """
+    total = sys.getsizeof(obj)
+    attrs = getattr(obj, "__dict__", {})
+    total += sys.getsizeof(attrs)
+    for value in attrs.values():
+        total += getattr(value, "nbytes", 0) or sys.getsizeof(value)
+    return total
+
+
+# =========================================================
+# 🧠 MODEL REGISTRY
+# =========================================================
+class ModelRegistry:
+    """Thread-safe, lazily populated cache of the pickled models and of
+    the versions predictions are served from."""
+
+    def __init__(self, model_dir=MODEL_DIR, model_files=None, keep=DEFAULT_KEEP):
+        self.model_dir = model_dir
+        self.model_files = dict(model_files or MODEL_FILES)
+        self.keep = keep
+        self._models = {}
+        self._fingerprints = {}
+        self._stats = {}
+        self._active = {}
+        self._history = {name: deque(maxlen=keep) for name in self.model_files}
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        """Absolute path of the ``.sav`` file for ``name``."""
+        try:
+            filename = self.model_files[name]
+        except KeyError:
+            raise KeyError(
+                f"Unknown model {name!r}; expected one of {sorted(self.model_files)}"
+            ) from None
+        return os.path.join(self.model_dir, filename)
+
+    def fingerprint(self, name):
+        """Cheap change marker of the ``.sav`` file: (mtime_ns, size)."""
+        st = os.stat(self.path(name))
+        return st.st_mtime_ns, st.st_size
+
+    def read(self, name):
+        """``(content, fingerprint)`` of the ``.sav`` file, from one open."""
+        with open(self.path(name), "rb") as fh:
+            st = os.fstat(fh.fileno())
+            return fh.read(), (st.st_mtime_ns, st.st_size)
+
+    def get(self, name):
+        """Return the model ``name``, loading it on first use or change."""
+        fingerprint = self.fingerprint(name)
+        model = self._models.get(name)
+        if model is not None and self._fingerprints.get(name) == fingerprint:
+            return model
+
+        # Double-checked locking: only one thread unpickles a given model
+        with self._lock:
+            model = self._models.get(name)
+            if model is None or self._fingerprints.get(name) != fingerprint:
+                model = self._load(name, fingerprint)
+        return model
+
+    def _load(self, name, fingerprint):
+        start = time.perf_counter()
+        with metrics.stage(name, "load"):
+            content, fingerprint = self.read(name)
+            model = pickle.loads(content)
+        self.record_load(name, self.path(name), time.perf_counter() - start, model)
+        self._models[name] = model
+        self._fingerprints[name] = fingerprint
+        return model
+
+    def record_load(self, name, path, seconds, obj):
+        """Record load statistics for ``name`` (also used by other loaders)."""
+        self._stats[name] = ModelStats(
+            name=name,
+            path=path,
+            load_seconds=seconds,
+            file_bytes=os.path.getsize(path),
+            memory_bytes=_estimate_memory(obj),
+        )
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def stats(self):
+        """Load statistics of every model loaded so far, keyed by name."""
+        return dict(self._stats)
+
+    def clear(self):
+        """Drop all loaded models and versions (reloaded on next use)."""
+        with self._lock:
+            self._models.clear()
+            self._fingerprints.clear()
+            self._stats.clear()
+            self._active.clear()
+            for history in self._history.values():
+                history.clear()
+
+    # -----------------------------------------------------
+    # Serving versions
+    # -----------------------------------------------------
+    def active(self, name):
+        """The ``ModelVersion`` predictions of ``name`` use (None if unset)."""
+        return self._active.get(name)
+
+    def activate(self, name, model):
+        """Serve ``model`` (which has a ``version``) from now on.
+
+        The replaced version moves to the rollback history. Returns the new
+        ``ModelVersion``.
+        """
+        entry = ModelVersion(name=name, version=model.version, model=model)
+        with self._lock:
+            self._swap(name, entry)
+        return entry
+
+    def rollback(self, name, version=None):
+        """Serve a previous version of ``name`` again and return it.
+
+        ``version`` (or a prefix of it) selects the version; by default the
+        most recently replaced one. Raises ``LookupError`` if there is no
+        such version in the history.
+        """
+        with self._lock:
+            history = self._history[name]
+            for entry in history:
+                if version is None or entry.version.startswith(version):
+                    break
+            else:
+                wanted = f"version {version}" if version else "version"
+                raise LookupError(f"No previous {wanted} of {name!r} to roll back to")
+            history.remove(entry)
+            entry = replace(entry, activated_at=time.time())
+            self._swap(name, entry)
+        return entry
+
+    def history(self, name):
+        """Replaced versions of ``name`` available for rollback, newest first."""
+        return list(self._history[name])
+
+    def _swap(self, name, entry):
+        history = self._history[name]
+        for old in [e for e in history if e.version == entry.version]:
+            history.remove(old)
+        current = self._active.get(name)
+        if current is not None and current.version != entry.version:
+            history.appendleft(current)
+        # One reference assignment: readers see the old or the new version
+        self._active[name] = entry
+
+
+# Shared by every session and thread of the server process
+registry = ModelRegistry()
+
+
+def get_model(name):
+    """Shortcut for ``registry.get(name)``."""
+    return registry.get(name)
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Hot reload of retrained models for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Shipping a retrained ``heart_disease_model.sav`` used to require a server
+restart, which drops every active Streamlit session. The watcher defined
+here polls the model directory (``MDPS_MODEL_DIR``, by default the app
+directory) from a background thread. When a ``.sav`` file changes, it
+
+1. waits until the file has stopped changing (one poll interval),
+2. loads and validates it: a fitted linear classifier with the expected
+   feature count (and feature names), class labels 0 / 1, and a parity
+   smoke test of the scoring engine against the estimator itself,
+3. swaps it in atomically (``registry.activate``). Predictions already
+   running finish on the version they started with, and new ones use
+   the new version. Nothing on the prediction path waits for the watcher.
+
+A rejected or unreadable file is recorded in ``events`` and the active
+version keeps serving. Replaced versions stay available for ``registry.rollback``.
+Write new model files elsewhere and move them into place
+(``os.replace``), so a half-written file is never picked up.
+
+``MDPS_MODEL_POLL`` sets the poll interval in seconds (default 2; 0
+disables the watcher).
+
+USAGE:
+------
+    python model_watcher.py validate heart retrained_heart_model.sav
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from linear_engine import LinearModel, matches_estimator, parity_rows
+from model_registry import registry
+from schema import SCHEMAS
+
+POLL_SECONDS = float(os.environ.get("MDPS_MODEL_POLL", 2.0))
+
+# Every page maps prediction 1 to "disease detected"
+EXPECTED_CLASSES = (0, 1)
+
+# Rows of the parity smoke test run on every candidate
+SMOKE_ROWS = 1_000
+
+
+# =========================================================
+# ✅ VALIDATION
+# =========================================================
+def validate(name, estimator, current=None):
+    """Problems that keep ``estimator`` from serving model ``name``.
+
+    ``current`` is the ``LinearModel`` serving now; if both were fitted on
+    named columns, the candidate must use the same feature order. Returns
+    an empty list for a valid estimator.
+    """
+    if not all(hasattr(estimator, a) for a in ("coef_", "intercept_", "classes_")):
+        return [f"{type(estimator).__name__} is not a fitted linear classifier"]
+
+    problems = []
+    n_features = len(SCHEMAS[name].keys)
+    if np.shape(estimator.coef_) != (1, n_features):
+        problems.append(
+            f"expected {n_features} features, coef_ has shape {np.shape(estimator.coef_)}"
+        )
+    classes = tuple(np.asarray(estimator.classes_).tolist())
+    if classes != EXPECTED_CLASSES:
+        problems.append(f"expected class labels {EXPECTED_CLASSES}, got {classes}")
+    features = getattr(estimator, "feature_names_in_", None)
+    if (
+        features is not None and current is not None
+        and current.features != LinearModel.unnamed_features(current.n_features)
+        and tuple(str(f) for f in features) != current.features
+    ):
+        problems.append("feature names or order differ from the active model")
+    if problems:
+        return problems
+
+    model = LinearModel.from_estimator(name, estimator)
+    if not (np.isfinite(model.coef).all() and np.isfinite(model.intercept).all()):
+        return ["coefficients are not finite"]
+    try:
+        if not matches_estimator(model, estimator, parity_rows(n_features, SMOKE_ROWS)):
+            problems.append("parity smoke test failed: engine and estimator disagree")
+    except Exception as exc:
+        problems.append(f"parity smoke test raised {exc!r}")
+    return problems
+
+
+# =========================================================
+# 👀 WATCHER
+# =========================================================
+@dataclass(frozen=True)
+class WatchEvent:
+    """Outcome of one model file the watcher picked up."""
+
+    name: str
+    version: str             # None: the file could not be read
+    accepted: bool
+    problems: tuple = ()
+    at: float = field(default_factory=time.time)
+
+
+class ModelWatcher(threading.Thread):
+    """Background thread activating validated new versions of the models."""
+
+    def __init__(self, registry=registry, interval=POLL_SECONDS):
+        super().__init__(name="mdps-model-watcher", daemon=True)
+        self.registry = registry
+        self.interval = interval
+        self.events = deque(maxlen=50)
+        self._seen = {}
+        self._pending = {}
+        self._unreadable = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def poll(self):
+        """Check every model file once."""
+        for name in self.registry.model_files:
+            try:
+                self.check(name)
+            except OSError:
+                # Missing or being replaced: look again on the next poll
+                continue
+
+    def check(self, name):
+        """Validate and activate ``name``'s file if it changed and settled."""
+        fingerprint = self.registry.fingerprint(name)
+        if fingerprint == self._seen.get(name):
+            return
+        if fingerprint != self._pending.get(name):
+            # Changed since the last poll: wait until the writer is done
+            self._pending[name] = fingerprint
+            return
+        del self._pending[name]
+
+        active = self.registry.active(name)
+        start = time.perf_counter()
+        try:
+            content, fingerprint = self.registry.read(name)
+        except PermissionError as exc:
+            # Retried on every poll (fixing the mode does not change the
+            # fingerprint), but reported once per file
+            if self._unreadable.get(name) != fingerprint:
+                self._unreadable[name] = fingerprint
+                self.events.append(
+                    WatchEvent(name, None, False, (f"cannot be read: {exc.strerror}",))
+                )
+            self._pending[name] = fingerprint
+            return
+        self._unreadable.pop(name, None)
+        self._seen[name] = fingerprint
+        version = hashlib.sha256(content).hexdigest()
+        # Not loaded yet (its first use loads the file) or already serving
+        if active is None or active.version == version:
+            return
+
+        try:
+            estimator = pickle.loads(content)
+        except Exception as exc:
+            problems = [f"cannot be unpickled: {exc!r}"]
+        else:
+            problems = validate(name, estimator, current=active.model)
+        if problems:
+            self.events.append(WatchEvent(name, version, False, tuple(problems)))
+            return
+
+        model = LinearModel.from_estimator(name, estimator, version=version)
+        self.registry.record_load(
+            name, self.registry.path(name), time.perf_counter() - start, model
+        )
+        self.registry.activate(name, model)
+        self.events.append(WatchEvent(name, version, True))
+
+
+_watcher = None
+_start_lock = threading.Lock()
+
+
+def start(interval=POLL_SECONDS):
+    """Start the process-wide watcher once and return it (None if disabled)."""
+    global _watcher
+    if interval <= 0:
+        return None
+    with _start_lock:
+        if _watcher is None:
+            _watcher = ModelWatcher(interval=interval)
+            _watcher.start()
+    return _watcher
+
+
+def watcher():
+    """The running process-wide watcher, or None."""
+    return _watcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a model file before shipping it")
+    parser.add_argument("command", choices=["validate"])
+    parser.add_argument("model", choices=sorted(registry.model_files))
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "rb") as fh:
+        estimator = pickle.load(fh)
+    current = LinearModel.from_estimator(args.model, registry.get(args.model))
+    problems = validate(args.model, estimator, current=current)
+    for problem in problems:
+        print(f"{args.model}: {problem}", file=sys.stderr)
+    if not problems:
+        print(f"{args.model}: {args.path} is valid")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
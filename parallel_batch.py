@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-process batch scoring for very large cohorts.
+
+PURPOSE:
+--------
+Nightly population screening scores tens of millions of rows, more than
+one Python process can parse and score. This runner
+
+* splits each input CSV into byte ranges aligned on line boundaries, so
+  every worker parses its own slice (parsing is the dominant cost),
+* publishes the LogisticRegression coefficients of every model once in a
+  ``multiprocessing.shared_memory`` block; workers attach to it instead
+  of unpickling the ``.sav`` files (or importing scikit-learn),
+* validates and scores each slice with the same rules and output format
+  as the single-process batch path (batch_scoring.py),
+* streams the scored slices back into one output file in input order,
+  keeping at most ``2 x workers`` slices in flight (workers write their
+  slice to a part file and return only its path and row counts),
+* audits the run with one bulk manifest (audit_log.py, source
+  ``parallel_batch``): model version, row counts and the sha256 of every
+  input file and of the output, which holds each row's inputs and result.
+
+A crashed worker (killed process, out-of-memory, ...) stops the run with
+an error and leaves no partial output file behind.
+
+Input files must be plain numeric CSVs without quoted multi-line fields.
+
+USAGE:
+------
+    python parallel_batch.py heart cohort.csv scored.csv --workers 8
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from batch_scoring import check_columns, output_columns, score_frame
+from linear_engine import LinearModel, get_linear
+from schema import SCHEMAS
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+# =========================================================
+# 🧠 SHARED-MEMORY COEFFICIENTS
+# =========================================================
+def publish_models(model_names):
+    """Copy coefficients into one shared block.
+
+    Returns ``(shm, layout)`` where ``layout`` is the small, picklable
+    description workers need to rebuild each model from the block.
+    """
+    models = [get_linear(name) for name in model_names]
+    size = sum(m.n_features + 1 for m in models) * 8
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    buffer = np.ndarray(size // 8, dtype=np.float64, buffer=shm.buf)
+
+    layout, offset = [], 0
+    for m in models:
+        n = m.n_features
+        buffer[offset:offset + n] = m.coef.ravel()
+        buffer[offset + n] = m.intercept[0]
+        layout.append((m.name, offset, n, m.classes.tolist(), m.features, m.version))
+        offset += n + 1
+    return shm, layout
+
+
+# Per-worker state, filled by _init_worker
+_shm = None
+_models = {}
+
+
+def _init_worker(shm_name, layout):
+    global _shm
+    # Spawned workers share the parent's resource tracker, and the parent
+    # unlinks the block once the run is over
+    _shm = shared_memory.SharedMemory(name=shm_name)
+
+    total = sum(n + 1 for _, _, n, _, _, _ in layout)
+    buffer = np.ndarray(total, dtype=np.float64, buffer=_shm.buf)
+    for name, offset, n, classes, features, version in layout:
+        _models[name] = LinearModel(
+            name=name,
+            coef=buffer[offset:offset + n].reshape(1, n),
+            intercept=buffer[offset + n:offset + n + 1],
+            classes=np.asarray(classes),
+            features=features,
+            version=version,
+        )
+
+
+# =========================================================
+# ✂️ INPUT SPLITTING
+# =========================================================
+def split_ranges(path, chunk_bytes):
+    """Header line and ``(start, end)`` byte ranges on line boundaries."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        start = fh.tell()
+        ranges = []
+        while start < size:
+            fh.seek(min(start + chunk_bytes, size))
+            if fh.tell() < size:
+                fh.readline()
+            end = fh.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+# =========================================================
+# 👷 WORKER TASK
+# =========================================================
+def _score_range(model_name, path, header, start, end, out_dir, index):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    frame = pd.read_csv(io.BytesIO(header + data))
+    model = _models[model_name]
+    scored = score_frame(model_name, frame, scorer=model.score, model=model)
+
+    part = os.path.join(out_dir, f"part-{index:06d}.csv")
+    scored.to_csv(part, index=False, header=False)
+    invalid = int((scored["errors"] != "").sum())
+    return part, len(scored), invalid
+
+
+# =========================================================
+# 🚀 RUNNER
+# =========================================================
+def run(model_name, inputs, output, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES,
+        progress=None):
+    """Score CSV ``inputs`` into ``output`` with a process pool.
+
+    Returns ``(rows, invalid_rows)``. Raises ``RuntimeError`` if a worker
+    process dies; ``output`` is then not created. A completed run is
+    queued to the audit log as one bulk manifest.
+    """
+    # Imported here: spawned workers import this module and must not
+    # start audit writers of their own
+    from audit_log import audit
+
+    workers = workers or os.cpu_count() or 1
+    tasks, header = [], None
+    for path in inputs:
+        file_header, ranges = split_ranges(path, chunk_bytes)
+        columns = file_header.decode().strip().split(",")
+        check_columns(model_name, columns)
+        if header is None:
+            header = file_header
+        elif file_header.strip() != header.strip():
+            raise ValueError(f"{path}: header differs from {inputs[0]}")
+        tasks.extend((path, file_header, start, end) for start, end in ranges)
+    if header is None:
+        raise ValueError("No input files given")
+
+    shm, layout = publish_models([model_name])
+    version = layout[0][5]
+    started = time.perf_counter()
+    tmp_dir = tempfile.mkdtemp(prefix="mdps-parallel-", dir=os.path.dirname(
+        os.path.abspath(output)))
+    partial = output + ".partial"
+    rows = invalid = 0
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(shm.name, layout)) as pool, \
+                open(partial, "wb") as out:
+            added = ",".join(output_columns(model_name)).encode()
+            columns = header.rstrip(b"\r\n") + b"," + added + b"\n"
+            out.write(columns)
+            # Hashed while written, for the audit manifest
+            digest = hashlib.sha256(columns)
+
+            # Ordered streaming with a bounded window of in-flight slices
+            window = []
+            next_task = 0
+            while next_task < len(tasks) or window:
+                while next_task < len(tasks) and len(window) < 2 * workers:
+                    path, file_header, start, end = tasks[next_task]
+                    window.append(pool.submit(
+                        _score_range, model_name, path, file_header,
+                        start, end, tmp_dir, next_task,
+                    ))
+                    next_task += 1
+                part, n, bad = window.pop(0).result()
+                with open(part, "rb") as fh:
+                    for chunk in iter(lambda: fh.read(COPY_CHUNK_BYTES), b""):
+                        digest.update(chunk)
+                        out.write(chunk)
+                os.remove(part)
+                rows += n
+                invalid += bad
+                if progress is not None:
+                    progress(rows)
+        os.replace(partial, output)
+        if audit is not None:
+            audit.log_bulk(
+                model_name, version, rows, invalid, inputs, output,
+                (time.perf_counter() - started) * 1000, "parallel_batch",
+                output_sha256=digest.hexdigest(),
+            )
+    except BrokenProcessPool as exc:
+        raise RuntimeError(
+            "A scoring worker crashed; no output was written"
+        ) from exc
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shm.close()
+        shm.unlink()
+    return rows, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel cohort batch scoring")
+    parser.add_argument("model", choices=sorted(SCHEMAS))
+    parser.add_argument("inputs", nargs="+", help="input CSV file(s)")
+    parser.add_argument("output", help="output CSV file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-mb", type=float,
+                        default=DEFAULT_CHUNK_BYTES / 1024 / 1024,
+                        help="size of the slice each worker parses at once")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        rows, invalid = run(
+            args.model, args.inputs, args.output, workers=args.workers,
+            chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+            progress=lambda n: print(f"\rScored {n:,} rows", end="", flush=True),
+        )
+    except (RuntimeError, ValueError) as exc:
+        print(f"\nerror: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    # Write the queued audit manifest before exiting
+    from audit_log import audit
+    if audit is not None:
+        audit.close(timeout=None)
+        dropped = audit.stats()["dropped_rows"]
+        if dropped:
+            print(f"\nwarning: the audit manifest of {dropped:,} rows was not written "
+                  "(audit writer stopped)", file=sys.stderr)
+    print(f"\nScored {rows:,} rows ({invalid:,} invalid) in {elapsed:.1f} s "
+          f"({rows / elapsed:,.0f} rows/s) with {args.workers} workers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
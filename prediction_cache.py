@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Shared prediction cache for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Many submissions are repeats (resubmitted forms, demo defaults, duplicate
+kiosk records). The cache keeps the ``(prediction, probability)`` of every
+recently scored feature vector so repeats are answered without scoring.
+
+* One instance lives at module level in ``inference``, so it is shared by
+  every Streamlit session, the batch paths and the HTTP service.
+* Keys are the model name, the model version (hash of its ``.sav`` file)
+  and the exact float64 bytes of the feature vector. A new ``.sav`` file
+  therefore never hits old entries, and ``invalidate`` drops them.
+* The in-memory tier is an LRU bounded by ``max_entries`` with an optional
+  TTL; an optional SQLite file adds a persistent on-disk tier. Disk reads
+  (one ``IN (...)`` query per batch) run outside the cache lock, and
+  disk writes are committed by a background thread, so no scoring
+  thread waits for an fsync.
+* Hit / miss / eviction counters are exposed by ``stats()``.
+
+Large batches bypass the cache (``max_rows``): for these small linear
+models, per-row lookups cost more than scoring a big block directly.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Keys per SELECT (SQLite's default variable limit is 999)
+DISK_LOOKUP_BATCH = 500
+
+# Store batches waiting for the disk writer; more are dropped (best effort)
+MAX_PENDING_WRITES = 1_000
+
+
+# =========================================================
+# 🗄️ PREDICTION CACHE
+# =========================================================
+class PredictionCache:
+    """Thread-safe LRU cache of per-row predictions."""
+
+    def __init__(self, max_entries=100_000, ttl=None, db_path=None,
+                 max_rows=1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.disk_hits = self.evictions = 0
+
+        self._db = None
+        if db_path:
+            # One connection per side: the writer thread owns ``_db``,
+            # lookups read through ``_reader`` (WAL: readers never wait
+            # for a commit)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " key BLOB PRIMARY KEY, model TEXT, version TEXT,"
+                " prediction INTEGER, probability REAL, created REAL)"
+            )
+            self._db.commit()
+            self._reader = sqlite3.connect(db_path, check_same_thread=False)
+            self._read_lock = threading.Lock()
+            self._writes = queue.Queue(maxsize=MAX_PENDING_WRITES)
+            threading.Thread(
+                target=self._write_loop, daemon=True, name="mdps-cache-writer"
+            ).start()
+
+    # -----------------------------------------------------
+    # Keys
+    # -----------------------------------------------------
+    @staticmethod
+    def row_keys(model_name, version, X):
+        """One hashable key per row of the float64 matrix ``X``."""
+        # Adding 0.0 folds -0.0 into 0.0 so equal values share a key
+        X = np.ascontiguousarray(X, dtype=np.float64) + 0.0
+        prefix = f"{model_name}:{version}:".encode()
+        return [prefix + row.tobytes() for row in X]
+
+    # -----------------------------------------------------
+    # Lookup / store
+    # -----------------------------------------------------
+    def lookup(self, model_name, version, keys):
+        """Return ``{row_index: (prediction, probability)}`` for hits."""
+        self._check_version(model_name, version)
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl and now - entry[2] > self.ttl:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    found[i] = entry[:2]
+
+        disk = {}
+        if missing and self._db is not None:
+            disk = self._disk_lookup([keys[i] for i in missing], missing)
+
+        with self._lock:
+            for i, value in disk.items():
+                self._insert(keys[i], value, now)
+            found.update(disk)
+            self.disk_hits += len(disk)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, model_name, version, keys, predictions, probabilities):
+        now = time.monotonic()
+        values = [(int(p), float(q)) for p, q in zip(predictions, probabilities)]
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._insert(key, value, now)
+        if self._db is not None:
+            created = time.time()
+            try:
+                self._writes.put_nowait((
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)",
+                    [(k, model_name, version, v[0], v[1], created)
+                     for k, v in zip(keys, values)],
+                ))
+            except queue.Full:
+                # Disk tier behind: these rows are only cached in memory
+                pass
+
+    def _insert(self, key, value, now):
+        self._entries[key] = (value[0], value[1], now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_lookup(self, keys, indices):
+        """``{index: (prediction, probability)}`` of the keys found on disk."""
+        cutoff = time.time() - self.ttl if self.ttl else 0.0
+        index = {}
+        for key, i in zip(keys, indices):
+            index.setdefault(key, []).append(i)
+        keys = list(index)
+        found = {}
+        with self._read_lock:
+            for start in range(0, len(keys), DISK_LOOKUP_BATCH):
+                batch = keys[start:start + DISK_LOOKUP_BATCH]
+                rows = self._reader.execute(
+                    "SELECT key, prediction, probability FROM predictions"
+                    f" WHERE key IN ({', '.join('?' * len(batch))})"
+                    " AND created >= ?",
+                    (*batch, cutoff),
+                )
+                for key, prediction, probability in rows:
+                    for i in index[key]:
+                        found[i] = (prediction, probability)
+        return found
+
+    # -----------------------------------------------------
+    # Disk writer (background thread)
+    # -----------------------------------------------------
+    def _write_loop(self):
+        while True:
+            statements = [self._writes.get()]
+            # Everything queued meanwhile goes into the same commit
+            while True:
+                try:
+                    statements.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for sql, params in statements:
+                    if isinstance(params, list):
+                        self._db.executemany(sql, params)
+                    else:
+                        self._db.execute(sql, params)
+                self._db.commit()
+            except sqlite3.Error:
+                # The disk tier is best effort: a lost write is a future miss
+                self._db.rollback()
+            finally:
+                for _ in statements:
+                    self._writes.task_done()
+
+    def flush(self):
+        """Wait until every queued disk write is committed."""
+        if self._db is not None:
+            self._writes.join()
+
+    # -----------------------------------------------------
+    # Invalidation
+    # -----------------------------------------------------
+    def _check_version(self, model_name, version):
+        if self._versions.get(model_name) != version:
+            self.invalidate(model_name, keep_version=version)
+
+    def invalidate(self, model_name=None, keep_version=None):
+        """Drop cached entries of ``model_name`` (all models if None).
+
+        With ``keep_version`` only entries of other versions are dropped.
+        """
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+                self._versions.clear()
+                statement = ("DELETE FROM predictions", ())
+            else:
+                statement = self._drop(model_name, keep_version)
+        if self._db is not None:
+            # Queued behind earlier writes, so none of them survives
+            self._writes.put(statement)
+
+    def _drop(self, model_name, keep_version):
+        """Drop ``model_name``'s memory entries (lock held); returns the disk DELETE."""
+        prefix = f"{model_name}:".encode()
+        keep = f"{model_name}:{keep_version}:".encode() if keep_version else None
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            if keep is None or not key.startswith(keep):
+                del self._entries[key]
+        if keep_version:
+            self._versions[model_name] = keep_version
+        else:
+            self._versions.pop(model_name, None)
+        return (
+            "DELETE FROM predictions WHERE model = ? AND version != ?",
+            (model_name, keep_version or ""),
+        )
+
+    # -----------------------------------------------------
+    # Statistics
+    # -----------------------------------------------------
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
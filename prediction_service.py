@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+Standalone HTTP prediction service for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Serves the three models to other systems without the Streamlit UI:
+
+    POST /predict/diabetes
+    POST /predict/heart
+    POST /predict/parkinsons
+    POST /screen      (one patient, all three models; see screening.py)
+    GET  /models      (active and previous model versions)
+    POST /models/<model>/rollback   (optional body: {"version": ...})
+    GET  /health
+    GET  /metrics     (Prometheus text, when MDPS_METRICS=1)
+
+The request body is a JSON object mapping every feature name (see
+``inference.FEATURES``) to its value, or a JSON list of values in
+feature order. Inputs go through the same validation rules as the
+Streamlit forms (HTTP 422 with the error list on failure).
+
+Valid requests are queued per model and scored together by a dynamic
+micro-batcher: a batch is flushed as soon as ``max_batch_size`` rows are
+waiting or ``max_wait_ms`` has passed since its first row, whichever
+comes first, in one vectorized call. When a model's queue is full the
+service answers HTTP 503 immediately (backpressure) instead of letting
+latency grow without bound.
+
+Every result names the model version that produced it. Retrained model
+files are validated and swapped in while the service runs (see
+model_watcher.py).
+
+The service runs on Tornado, which is already installed with Streamlit.
+
+USAGE:
+------
+    python prediction_service.py --port 8000 --max-batch-size 64 --max-wait-ms 5
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import tornado.web
+
+import inference
+import metrics
+import model_watcher
+import screening
+from linear_engine import get_linear
+from model_registry import registry
+from schema import validate
+
+
+# =========================================================
+# 📦 MICRO-BATCHER
+# =========================================================
+class QueueFullError(Exception):
+    """Raised when a model's request queue is at capacity."""
+
+
+class MicroBatcher:
+    """Collects single-row requests and scores them in batches."""
+
+    def __init__(self, model_name, max_batch_size=64, max_wait_ms=5.0,
+                 max_queue=1024):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row):
+        """Queue one feature row.
+
+        Resolves to ``(prediction, probability, model_version)``.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((row, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(self.model_name) from None
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        futures = [future for _, future in batch]
+        try:
+            X = np.array([row for row, _ in batch], dtype=np.float64)
+            model = get_linear(self.model_name)
+            predictions, probabilities = inference.score(
+                self.model_name, X, source="api", model=model
+            )
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        for future, label, proba in zip(futures, predictions, probabilities):
+            # The client may have disconnected and cancelled its future
+            if not future.done():
+                future.set_result((int(label), float(proba), model.version))
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+        }
+
+
+# =========================================================
+# 🧾 REQUEST PARSING
+# =========================================================
+def parse_row(model_name, payload):
+    """Turn a JSON payload into a feature row; raises ``ValueError``."""
+    features = inference.FEATURES[model_name]
+    if isinstance(payload, dict):
+        missing = [f for f in features if f not in payload]
+        if missing:
+            raise ValueError(f"Missing features: {', '.join(missing)}")
+        row = [payload[f] for f in features]
+    elif isinstance(payload, list):
+        row = payload
+    else:
+        raise ValueError("Body must be a JSON object or list of feature values")
+
+    if len(row) != len(features):
+        raise ValueError(f"Expected {len(features)} features, got {len(row)}")
+    try:
+        return [float(v) for v in row]
+    except (TypeError, ValueError):
+        raise ValueError("All feature values must be numbers") from None
+
+
+def parse_patient(payload):
+    """Turn a JSON patient record into a screening row; raises ``ValueError``.
+
+    Absent fields become NaN, so the models needing them report errors.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Body must be a JSON object of patient fields")
+    unknown = [k for k in payload if k not in screening.FIELD_INDEX]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    try:
+        return [float(v) for v in screening.row_from_mapping(payload)]
+    except (TypeError, ValueError):
+        raise ValueError("All field values must be numbers") from None
+
+
+# =========================================================
+# 🌐 HTTP HANDLERS
+# =========================================================
+class JSONHandler(tornado.web.RequestHandler):
+
+    def write_json(self, status, body):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(body))
+
+
+class PredictHandler(JSONHandler):
+
+    def initialize(self, batchers):
+        self.batchers = batchers
+
+    async def post(self, model_name):
+        batcher = self.batchers.get(model_name)
+        if batcher is None:
+            return self.write_json(404, {"error": f"Unknown model {model_name!r}"})
+
+        start = time.perf_counter()
+        try:
+            row = parse_row(model_name, json.loads(self.request.body or b"null"))
+        except ValueError as exc:
+            return self.write_json(400, {"error": str(exc)})
+
+        with metrics.stage(model_name, "validate"):
+            errors = validate(model_name, [row])[0]
+        if errors:
+            return self.write_json(422, {"errors": errors})
+
+        try:
+            prediction, probability, version = await batcher.submit(row)
+        except QueueFullError:
+            self.set_header("Retry-After", "1")
+            return self.write_json(503, {"error": "Server busy, retry later"})
+
+        self.write_json(200, {
+            "model": model_name,
+            "prediction": prediction,
+            "probability": probability,
+            "model_version": version,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        })
+
+
+class ScreenHandler(JSONHandler):
+    """Scores one patient with all three models in one fused step.
+
+    A screen is a single small matrix product, so it is scored inline
+    rather than queued through the per-model micro-batchers.
+    """
+
+    def post(self):
+        start = time.perf_counter()
+        try:
+            row = parse_patient(json.loads(self.request.body or b"null"))
+        except ValueError as exc:
+            return self.write_json(400, {"error": str(exc)})
+
+        stacked = screening.get_stacked()
+        predictions, probabilities, valid = screening.screen(
+            [row], source="api", stacked=stacked
+        )
+        row_errors = screening.errors([row])[0] if not valid.all() else {}
+        results = {}
+        for j, name in enumerate(screening.MODEL_NAMES):
+            if valid[0, j]:
+                results[name] = {
+                    "prediction": int(predictions[0, j]),
+                    "probability": float(probabilities[0, j]),
+                    "model_version": stacked.versions[j],
+                }
+            else:
+                results[name] = {"errors": row_errors[name]}
+        self.write_json(200, {
+            "results": results,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        })
+
+
+def version_info(entry):
+    return {"version": entry.version, "activated_at": entry.activated_at}
+
+
+class ModelsHandler(JSONHandler):
+    """Active and previous versions of every model, and rejected files."""
+
+    def get(self):
+        models = {}
+        for name in inference.MODEL_NAMES:
+            active = registry.active(name)
+            models[name] = {
+                "active": version_info(active) if active else None,
+                "previous": [version_info(e) for e in registry.history(name)],
+            }
+        watcher = model_watcher.watcher()
+        rejected = [
+            {"model": e.name, "version": e.version, "problems": list(e.problems),
+             "at": e.at}
+            for e in (list(watcher.events) if watcher else []) if not e.accepted
+        ]
+        self.write_json(200, {"models": models, "rejected": rejected})
+
+
+class RollbackHandler(JSONHandler):
+
+    def post(self, model_name):
+        if model_name not in inference.MODEL_NAMES:
+            return self.write_json(404, {"error": f"Unknown model {model_name!r}"})
+        try:
+            body = json.loads(self.request.body or b"{}")
+        except ValueError:
+            return self.write_json(400, {"error": "Body must be a JSON object"})
+        if not isinstance(body, dict):
+            return self.write_json(400, {"error": "Body must be a JSON object"})
+        try:
+            entry = registry.rollback(model_name, body.get("version"))
+        except LookupError as exc:
+            return self.write_json(409, {"error": str(exc)})
+        self.write_json(200, {"model": model_name, "active": version_info(entry)})
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
+        self.write(metrics.metrics.render_prometheus())
+
+
+class HealthHandler(tornado.web.RequestHandler):
+
+    def initialize(self, batchers):
+        self.batchers = batchers
+
+    def get(self):
+        self.write({
+            "status": "ok",
+            "models": {name: b.stats() for name, b in self.batchers.items()},
+        })
+
+
+# =========================================================
+# 🚀 APPLICATION
+# =========================================================
+def make_app(max_batch_size=64, max_wait_ms=5.0, max_queue=1024):
+    """Build the Tornado application; call inside a running event loop."""
+    batchers = {
+        name: MicroBatcher(name, max_batch_size, max_wait_ms, max_queue)
+        for name in inference.MODEL_NAMES
+    }
+    for batcher in batchers.values():
+        batcher.start()
+
+    app = tornado.web.Application([
+        (r"/predict/([a-z]+)", PredictHandler, {"batchers": batchers}),
+        (r"/screen", ScreenHandler),
+        (r"/models", ModelsHandler),
+        (r"/models/([a-z]+)/rollback", RollbackHandler),
+        (r"/health", HealthHandler, {"batchers": batchers}),
+        (r"/metrics", MetricsHandler),
+    ])
+    app.batchers = batchers
+    return app
+
+
+async def serve(host, port, **batch_options):
+    # Load every model before accepting traffic
+    for name in inference.MODEL_NAMES:
+        inference.predict(name, np.zeros(len(inference.FEATURES[name])))
+    model_watcher.start()
+
+    app = make_app(**batch_options)
+    app.listen(port, address=host)
+    print(f"Serving predictions on http://{host}:{port}")
+    await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Health Predictor HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+            max_queue=args.max_queue,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Out-of-core incremental retraining of the three models.
+
+PURPOSE:
+--------
+The shipped ``.sav`` files are LogisticRegression fits made outside this
+repository, on datasets that fit in memory. This pipeline retrains a
+model from a labelled outcome file of any size (CSV or JSON lines,
+columns named as in ``inference.FEATURES`` or as in the original
+datasets, plus the label column). The file is streamed in chunks and
+never loaded whole:
+
+1. pass 1 learns the feature means and variances (streaming
+   ``StandardScaler.partial_fit``) of the training rows,
+2. ``epochs`` passes train an ``SGDClassifier`` with logistic loss
+   through ``partial_fit`` on standardized, shuffled chunks,
+3. the standardization is folded into the coefficients
+   (``coef / scale``, ``intercept - coef @ mean``), so the result is a
+   plain ``LogisticRegression`` that the app, the linear engine and the
+   model watcher load like the shipped models,
+4. a last pass scores the held-out rows with the retrained and the
+   active model and compares them.
+
+Every row is assigned to the training or held-out set by a seeded draw
+per chunk, so all passes see the same split. Peak memory is a few chunks
+plus fixed-size metric histograms, whatever the size of the file.
+
+USAGE:
+------
+    python retrain.py heart outcomes.csv --output heart_retrained.sav
+    python retrain.py diabetes outcomes.jsonl --epochs 5 --install
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from linear_engine import LinearModel, export_model, get_linear
+from model_registry import registry
+from schema import SCHEMAS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Label column of each model, as named in the original datasets
+LABELS = {
+    "diabetes": "Outcome",
+    "heart": "target",
+    "parkinsons": "status",
+}
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_EPOCHS = 5
+DEFAULT_HOLDOUT = 0.2
+
+# Probability bins of the streaming ROC AUC
+AUC_BINS = 10_000
+
+
+# =========================================================
+# 📖 CHUNKED LABELLED READER
+# =========================================================
+def column_names(model_name):
+    """``{column name: feature key}`` of the accepted input columns.
+
+    Both the app's feature keys and the column names the active model was
+    trained on (e.g. ``MDVP:Fo(Hz)`` for ``fo``) are accepted.
+    """
+    keys = SCHEMAS[model_name].keys
+    names = {k: k for k in keys}
+    features = get_linear(model_name).features
+    if features != LinearModel.unnamed_features(len(features)):
+        names.update(zip(features, keys))
+    return names
+
+
+def _records(source, chunk_size):
+    """DataFrame chunks of a CSV or JSON lines file."""
+    if source.endswith((".jsonl", ".json")):
+        with pd.read_json(source, lines=True, chunksize=chunk_size) as reader:
+            yield from reader
+    else:
+        with pd.read_csv(source, chunksize=chunk_size) as reader:
+            yield from reader
+
+
+def iter_chunks(model_name, source, label=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``(X, y, dropped)`` per chunk of the labelled file ``source``.
+
+    ``X`` holds the features in the model's order, ``y`` the 0/1 labels.
+    Rows with missing or non-numeric features, or a label other than 0/1,
+    are dropped and counted.
+    """
+    label = label or LABELS[model_name]
+    keys = list(SCHEMAS[model_name].keys)
+    names = column_names(model_name)
+    for chunk in _records(source, chunk_size):
+        chunk = chunk.rename(columns=names)
+        missing = [k for k in [*keys, label] if k not in chunk.columns]
+        if missing:
+            raise ValueError(f"{source} is missing columns: {', '.join(missing)}")
+        X = chunk[keys].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        y = pd.to_numeric(chunk[label], errors="coerce").to_numpy(dtype=np.float64)
+        keep = np.isfinite(X).all(axis=1) & np.isin(y, (0, 1))
+        yield X[keep], y[keep].astype(np.int64), int((~keep).sum())
+
+
+def iter_split(model_name, source, holdout, seed, **options):
+    """Yield ``(X, y, is_holdout, dropped)``; the split is the same every pass."""
+    for i, (X, y, dropped) in enumerate(iter_chunks(model_name, source, **options)):
+        is_holdout = np.random.default_rng([seed, i]).random(len(y)) < holdout
+        yield X, y, is_holdout, dropped
+
+
+# =========================================================
+# 📏 STREAMING METRICS
+# =========================================================
+class StreamingMetrics:
+    """Accuracy, log loss, Brier score and ROC AUC over chunks.
+
+    The AUC is computed from fixed probability histograms per class, so
+    memory does not grow with the number of rows (ties within one of the
+    ``AUC_BINS`` bins count half).
+    """
+
+    def __init__(self, bins=AUC_BINS):
+        self.n = 0
+        self.correct = 0
+        self.log_loss = 0.0
+        self.brier = 0.0
+        self.histograms = np.zeros((2, bins), dtype=np.int64)
+
+    def update(self, y, probability):
+        p = np.clip(probability, 1e-15, 1 - 1e-15)
+        self.n += len(y)
+        self.correct += int(((probability > 0.5) == (y == 1)).sum())
+        self.log_loss -= float(np.where(y == 1, np.log(p), np.log1p(-p)).sum())
+        self.brier += float(((probability - y) ** 2).sum())
+        bins = self.histograms.shape[1]
+        index = np.minimum((probability * bins).astype(np.intp), bins - 1)
+        for label in (0, 1):
+            self.histograms[label] += np.bincount(index[y == label], minlength=bins)
+
+    def auc(self):
+        negatives, positives = self.histograms
+        if not negatives.sum() or not positives.sum():
+            return float("nan")
+        below = np.cumsum(negatives) - negatives
+        pairs = (positives * (below + 0.5 * negatives)).sum()
+        return float(pairs / (positives.sum() * negatives.sum()))
+
+    def result(self):
+        n = self.n or 1
+        return {
+            "rows": self.n,
+            "accuracy": self.correct / n,
+            "log_loss": self.log_loss / n,
+            "brier": self.brier / n,
+            "roc_auc": self.auc(),
+        }
+
+
+# =========================================================
+# 🏋️ TRAINING
+# =========================================================
+def to_estimator(model_name, classifier, scaler):
+    """Fold the standardization into a plain ``LogisticRegression``."""
+    from sklearn.linear_model import LogisticRegression
+
+    coef = classifier.coef_ / scaler.scale_
+    estimator = LogisticRegression()
+    estimator.coef_ = coef
+    estimator.intercept_ = classifier.intercept_ - coef @ scaler.mean_
+    estimator.classes_ = np.array([0, 1])
+    estimator.n_features_in_ = coef.shape[1]
+    # Same column names as the active model, so the watcher accepts it
+    features = get_linear(model_name).features
+    if features != LinearModel.unnamed_features(len(features)):
+        estimator.feature_names_in_ = np.array(features, dtype=object)
+    return estimator
+
+
+def retrain(model_name, source, label=None, epochs=DEFAULT_EPOCHS,
+            holdout=DEFAULT_HOLDOUT, alpha=1e-4, chunk_size=DEFAULT_CHUNK_SIZE,
+            seed=0, progress=None):
+    """Retrain ``model_name`` from ``source`` out of core.
+
+    Returns ``(estimator, report)``. The report holds the row counts and
+    the held-out metrics of the active (``"current"``) and the retrained
+    (``"retrained"``) model. ``progress(pass_name, rows)`` is called after
+    every chunk.
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    def passes():
+        return iter_split(model_name, source, holdout, seed,
+                          label=label, chunk_size=chunk_size)
+
+    # Pass 1: feature means and variances of the training rows
+    scaler = StandardScaler()
+    train_rows = dropped = 0
+    with metrics.stage(model_name, "retrain_scale"):
+        for X, y, is_holdout, n_dropped in passes():
+            dropped += n_dropped
+            if (~is_holdout).any():
+                scaler.partial_fit(X[~is_holdout])
+                train_rows += int((~is_holdout).sum())
+            if progress is not None:
+                progress("scale", train_rows)
+    if train_rows == 0:
+        raise ValueError(f"{source} has no usable training rows")
+
+    # Passes 2..: stochastic gradient descent on standardized chunks
+    classifier = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+    rng = np.random.default_rng(seed)
+    for epoch in range(epochs):
+        rows = 0
+        with metrics.stage(model_name, "retrain_epoch"):
+            for X, y, is_holdout, _ in passes():
+                train = np.flatnonzero(~is_holdout)
+                if not len(train):
+                    continue
+                order = rng.permutation(train)
+                classifier.partial_fit(scaler.transform(X[order]), y[order],
+                                       classes=np.array([0, 1]))
+                rows += len(order)
+                if progress is not None:
+                    progress(f"epoch {epoch + 1}", rows)
+
+    estimator = to_estimator(model_name, classifier, scaler)
+    retrained = LinearModel.from_estimator(model_name, estimator)
+    current = get_linear(model_name)
+
+    # Last pass: held-out comparison
+    scores = {"current": StreamingMetrics(), "retrained": StreamingMetrics()}
+    with metrics.stage(model_name, "retrain_evaluate"):
+        for X, y, is_holdout, _ in passes():
+            if not is_holdout.any():
+                continue
+            for name, model in (("current", current), ("retrained", retrained)):
+                _, probability = model.score(X[is_holdout], exact=False)
+                scores[name].update(y[is_holdout], probability)
+            if progress is not None:
+                progress("evaluate", scores["current"].n)
+
+    report = {
+        "model": model_name,
+        "train_rows": train_rows,
+        "dropped_rows": dropped,
+        "epochs": epochs,
+        "current_version": current.version,
+        **{name: m.result() for name, m in scores.items()},
+    }
+    return estimator, report
+
+
+# =========================================================
+# 💾 OUTPUT
+# =========================================================
+def save(estimator, path):
+    """Pickle ``estimator`` to ``path`` atomically (write, then rename)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("wb", dir=directory, suffix=".tmp",
+                                     delete=False) as fh:
+        pickle.dump(estimator, fh)
+    # NamedTemporaryFile creates the file 0600; give it the mode a plain
+    # open() would, so a server running as another user can read it
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(fh.name, 0o666 & ~umask)
+    os.replace(fh.name, path)
+
+
+def install(model_name, estimator):
+    """Validate ``estimator`` and replace the served ``.sav`` file with it.
+
+    A running app or service picks the file up through its model watcher.
+    The ``.npz`` export is refreshed as well. Raises ``ValueError`` with
+    the validation problems if the estimator is rejected.
+    """
+    from model_watcher import validate
+
+    problems = validate(model_name, estimator, current=get_linear(model_name))
+    if problems:
+        raise ValueError("; ".join(problems))
+    save(estimator, registry.path(model_name))
+    export_model(model_name)
+
+
+def _peak_memory():
+    if resource is None:
+        return ""
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return f", peak memory {peak:.0f} MiB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrain a model from a labelled file")
+    parser.add_argument("model", choices=sorted(SCHEMAS))
+    parser.add_argument("source", help="labelled CSV or JSON lines file")
+    parser.add_argument("--label", help="label column (default: as in the original dataset)")
+    parser.add_argument("--output", help="write the retrained .sav file here")
+    parser.add_argument("--install", action="store_true",
+                        help="validate and replace the served .sav file")
+    parser.add_argument("--report", help="write the metrics report as JSON")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--holdout", type=float, default=DEFAULT_HOLDOUT)
+    parser.add_argument("--alpha", type=float, default=1e-4)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        estimator, report = retrain(
+            args.model, args.source, label=args.label, epochs=args.epochs,
+            holdout=args.holdout, alpha=args.alpha, chunk_size=args.chunk_size,
+            seed=args.seed,
+            progress=lambda stage, n: print(f"\r{stage}: {n:,} rows", end="",
+                                            flush=True),
+        )
+    except ValueError as exc:
+        print(f"\nerror: {exc}", file=sys.stderr)
+        return 1
+    print(f"\rTrained {args.model} on {report['train_rows']:,} rows "
+          f"({report['dropped_rows']:,} dropped) in "
+          f"{time.perf_counter() - start:.1f} s{_peak_memory()}")
+
+    print(f"Held-out rows: {report['retrained']['rows']:,}")
+    print(f"{'':10s} {'current':>10s} {'retrained':>10s}")
+    for key in ("accuracy", "log_loss", "brier", "roc_auc"):
+        print(f"{key:10s} {report['current'][key]:10.4f} {report['retrained'][key]:10.4f}")
+
+    if args.report:
+        with open(args.report, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.output:
+        save(estimator, args.output)
+        print(f"Wrote {args.output}")
+    if args.install:
+        try:
+            install(args.model, estimator)
+        except ValueError as exc:
+            print(f"error: not installed: {exc}", file=sys.stderr)
+            return 1
+        print(f"Installed {registry.path(args.model)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
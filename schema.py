@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative input schemas for the Health Predictor Web App.
+
+PURPOSE:
+--------
+One schema per model describes every input feature (session-state key,
+widget label, dtype, allowed range, default, display format), the form
+layout, and the warning / cross-field rules that used to be hand-written
+``if`` chains in each Streamlit page.
+
+The same schema
+
+* builds the ``st.number_input`` widgets of each form (mdps_public.py), and
+* validates whole NumPy arrays with vectorized masks, returning the error
+  messages of every row (batch scoring, HTTP service, form submit),
+
+so every entry point applies exactly the same rules.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# =========================================================
+# 🧱 SCHEMA BUILDING BLOCKS
+# =========================================================
+@dataclass(frozen=True)
+class Feature:
+    """One model input and its form widget."""
+
+    key: str
+    label: str
+    dtype: type = float
+    min_value: float = None
+    max_value: float = None
+    default: float = 0
+    step: float = None
+    format: str = None
+    # Message shown when the value is outside [min_value, max_value]
+    range_message: str = None
+
+    def widget_kwargs(self):
+        """Keyword arguments for ``st.number_input``."""
+        kwargs = {"key": self.key}
+        if self.min_value is not None:
+            kwargs["min_value"] = self.dtype(self.min_value)
+        if self.max_value is not None:
+            kwargs["max_value"] = self.dtype(self.max_value)
+        if self.step is not None:
+            kwargs["step"] = self.step
+        if self.format is not None:
+            kwargs["format"] = self.format
+        return kwargs
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A warning or cross-field rule.
+
+    ``check`` receives one column array per name in ``features`` and
+    returns a boolean mask that is True for the rows breaking the rule.
+    """
+
+    message: str
+    features: tuple
+    check: object
+
+
+@dataclass(frozen=True)
+class ModelSchema:
+    name: str
+    features: tuple
+    rules: tuple = ()
+    # Number of widgets per form row
+    layout: tuple = ()
+    _index: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        index = {f.key: i for i, f in enumerate(self.features)}
+        object.__setattr__(self, "_index", index)
+
+    @property
+    def keys(self):
+        return tuple(f.key for f in self.features)
+
+    @property
+    def defaults(self):
+        return {f.key: f.default for f in self.features}
+
+    def rows(self):
+        """Features grouped into form rows according to ``layout``."""
+        start = 0
+        for width in self.layout or (len(self.features),):
+            yield self.features[start:start + width]
+            start += width
+
+    # -----------------------------------------------------
+    # Vectorized validation
+    # -----------------------------------------------------
+    def error_masks(self, X):
+        """Yield ``(message, mask)`` pairs for a 2-D float array."""
+        X = np.asarray(X, dtype=np.float64)
+        # ±inf counts as missing too: unbounded features would pass it on
+        # to the model (probability 1.0, or NaN for mixed signs)
+        missing = ~np.isfinite(X)
+        for i, f in enumerate(self.features):
+            yield f"⚠️ {f.label} is missing or not a number.", missing[:, i]
+
+        with np.errstate(invalid="ignore"):
+            for i, f in enumerate(self.features):
+                col = X[:, i]
+                if f.min_value is not None or f.max_value is not None:
+                    lo = -np.inf if f.min_value is None else f.min_value
+                    hi = np.inf if f.max_value is None else f.max_value
+                    message = f.range_message or (
+                        f"⚠️ {f.label} must be between {lo} and {hi}."
+                    )
+                    yield message, (col < lo) | (col > hi)
+                if f.dtype is int:
+                    yield (
+                        f"⚠️ {f.label} must be a whole number.",
+                        np.isfinite(col) & (col != np.floor(col)),
+                    )
+            for rule in self.rules:
+                columns = [X[:, self._index[k]] for k in rule.features]
+                yield rule.message, np.asarray(rule.check(*columns), dtype=bool)
+
+    def validate(self, X):
+        """Return one list of error messages per row of ``X``."""
+        X = np.asarray(X, dtype=np.float64)
+        errors = [[] for _ in range(X.shape[0])]
+        for message, mask in self.error_masks(X):
+            for row in np.flatnonzero(mask):
+                if message not in errors[row]:
+                    errors[row].append(message)
+        return errors
+
+    def valid_mask(self, X):
+        """Boolean mask of the rows of ``X`` passing every rule."""
+        X = np.asarray(X, dtype=np.float64)
+        ok = np.ones(X.shape[0], dtype=bool)
+        for _, mask in self.error_masks(X):
+            ok &= ~mask
+        return ok
+
+    def validate_row(self, values):
+        """Error messages for one ``{key: value}`` mapping."""
+        return self.validate([[values[k] for k in self.keys]])[0]
+
+
+def _all_zero(*columns):
+    return np.all(np.column_stack(columns) == 0, axis=1)
+
+
+# =========================================================
+# 🩸 DIABETES
+# =========================================================
+DIABETES = ModelSchema(
+    name="diabetes",
+    features=(
+        Feature("Pregnancies", "Number of Pregnancies", int, 0, 20),
+        Feature("Glucose", "Glucose Level (mg/dL)", int, 0, 300),
+        Feature("BloodPressure", "Blood Pressure (mm Hg)", int, 0, 200),
+        Feature("SkinThickness", "Skin Thickness (mm)", int, 0, 100),
+        Feature("Insulin", "Insulin Level (µU/mL)", int, 0, 900),
+        Feature("BMI", "BMI", float, 0.0, 70.0, 0.0, format="%.2f"),
+        Feature("DPF", "Diabetes Pedigree Function", float, 0.0, 3.0, 0.0,
+                format="%.3f"),
+        Feature("Age", "Age", int, 1, 120, default=1),
+    ),
+    rules=(
+        Rule("⚠️ Glucose level seems too low.", ("Glucose",), lambda g: g < 70),
+        Rule("⚠️ Blood Pressure seems too low.", ("BloodPressure",),
+             lambda bp: bp < 40),
+        Rule("⚠️ BMI value seems invalid.", ("BMI",), lambda bmi: bmi < 10),
+        Rule("⚠️ Age must be at least 10 years.", ("Age",), lambda age: age < 10),
+    ),
+    layout=(3, 3, 2),
+)
+
+# =========================================================
+# ❤️ HEART DISEASE
+# =========================================================
+HEART = ModelSchema(
+    name="heart",
+    features=(
+        Feature("age", "Age", int, 1, 120, default=1),
+        Feature("sex", "Sex (1 = Male, 0 = Female)", int, 0, 1),
+        Feature("cp", "Chest Pain Type (0–3)", int, 0, 3),
+        Feature("trestbps", "Resting Blood Pressure", int, 80, 200, default=80,
+                range_message="⚠️ Resting BP must be 80–200 mm Hg."),
+        Feature("chol", "Serum Cholesterol", int, 100, 600, default=100,
+                range_message="⚠️ Cholesterol must be 100–600."),
+        Feature("fbs", "Fasting Blood Sugar > 120", int, 0, 1),
+        Feature("restecg", "Resting ECG (0–2)", int, 0, 2),
+        Feature("thalach", "Max Heart Rate", int, 60, 250, default=60,
+                range_message="⚠️ Max heart rate must be 60–250."),
+        Feature("exang", "Exercise Induced Angina", int, 0, 1),
+        Feature("oldpeak", "ST Depression", float, 0.0, 10.0, 0.0),
+        Feature("slope", "Slope (0–2)", int, 0, 2),
+        Feature("ca", "Major Vessels", int, 0, 4,
+                range_message="⚠️ Major vessels must be 0–4."),
+        Feature("thal", "Thal (0–2)", int, 0, 2),
+    ),
+    rules=(
+        Rule("⚠️ Age must be at least 10 years.", ("age",), lambda age: age < 10),
+    ),
+    layout=(3, 3, 3, 3, 1),
+)
+
+# =========================================================
+# 🧠 PARKINSON'S DISEASE
+# =========================================================
+def _voice(key, label, step, fmt):
+    return Feature(key, label, float, default=0.0, step=step, format=fmt)
+
+
+PARKINSONS = ModelSchema(
+    name="parkinsons",
+    features=(
+        # --- Frequency & Jitter Metrics ---
+        _voice("fo", "MDVP:Fo(Hz)", 0.001, "%.3f"),
+        _voice("fhi", "MDVP:Fhi(Hz)", 0.001, "%.3f"),
+        _voice("flo", "MDVP:Flo(Hz)", 0.001, "%.3f"),
+        _voice("Jitter_percent", "MDVP:Jitter(%)", 0.00001, "%.5f"),
+        _voice("Jitter_Abs", "MDVP:Jitter(Abs)", 0.00001, "%.5f"),
+        # --- Jitter & Shimmer Features ---
+        _voice("RAP", "MDVP:RAP", 0.00001, "%.5f"),
+        _voice("PPQ", "MDVP:PPQ", 0.00001, "%.5f"),
+        _voice("DDP", "Jitter:DDP", 0.00001, "%.5f"),
+        _voice("Shimmer", "MDVP:Shimmer", 0.00001, "%.5f"),
+        _voice("Shimmer_dB", "MDVP:Shimmer(dB)", 0.001, "%.3f"),
+        # --- Amplitude Perturbation Measures ---
+        _voice("APQ3", "Shimmer:APQ3", 0.00001, "%.5f"),
+        _voice("APQ5", "Shimmer:APQ5", 0.00001, "%.5f"),
+        _voice("APQ", "MDVP:APQ", 0.00001, "%.5f"),
+        _voice("DDA", "Shimmer:DDA", 0.00001, "%.5f"),
+        _voice("NHR", "NHR", 0.00001, "%.5f"),
+        # --- Noise & Nonlinear Measures ---
+        _voice("HNR", "HNR", 0.001, "%.3f"),
+        _voice("RPDE", "RPDE", 0.00001, "%.6f"),
+        _voice("DFA", "DFA", 0.00001, "%.6f"),
+        _voice("spread1", "spread1", 0.00001, "%.6f"),
+        _voice("spread2", "spread2", 0.00001, "%.6f"),
+        # --- Complexity Measures ---
+        _voice("D2", "D2", 0.00001, "%.6f"),
+        _voice("PPE", "PPE", 0.00001, "%.6f"),
+    ),
+    rules=(
+        Rule("⚠️ Frequency values (Fo, Fhi, Flo) must be greater than 0.",
+             ("fo", "fhi", "flo"),
+             lambda fo, fhi, flo: (fo <= 0) | (fhi <= 0) | (flo <= 0)),
+        Rule("⚠️ Jitter and Shimmer values cannot be negative.",
+             ("Jitter_percent", "Shimmer"),
+             lambda jitter, shimmer: (jitter < 0) | (shimmer < 0)),
+        Rule("⚠️ HNR must be greater than 0.", ("HNR",), lambda hnr: hnr <= 0),
+        Rule("⚠️ D2 and PPE must be greater than 0.", ("D2", "PPE"),
+             lambda d2, ppe: (d2 <= 0) | (ppe <= 0)),
+        # Prevent meaningless all-zero input
+        Rule("⚠️ Please enter valid data. All values cannot be zero.",
+             ("fo", "fhi", "flo", "Jitter_percent", "Jitter_Abs", "RAP", "PPQ",
+              "DDP", "Shimmer", "Shimmer_dB", "APQ3", "APQ5", "APQ", "DDA",
+              "NHR", "HNR", "RPDE", "DFA", "spread1", "spread2", "D2", "PPE"),
+             _all_zero),
+    ),
+    layout=(5, 5, 5, 5, 2),
+)
+
+# Typical ranges of the Parkinson's voice features (UCI dataset); the form
+# widgets have no bounds, these are used to sample and plot them
+PARKINSONS_RANGES = {
+    "fo": (88.0, 260.0), "fhi": (102.0, 592.0), "flo": (65.0, 239.0),
+    "Jitter_percent": (0.00168, 0.03316), "Jitter_Abs": (0.000007, 0.00026),
+    "RAP": (0.00068, 0.02144), "PPQ": (0.00092, 0.01958),
+    "DDP": (0.00204, 0.06433), "Shimmer": (0.00954, 0.11908),
+    "Shimmer_dB": (0.085, 1.302), "APQ3": (0.00455, 0.05647),
+    "APQ5": (0.0057, 0.0794), "APQ": (0.00719, 0.13778),
+    "DDA": (0.01364, 0.16942), "NHR": (0.00065, 0.31482),
+    "HNR": (8.441, 33.047), "RPDE": (0.25657, 0.685151),
+    "DFA": (0.574282, 0.825288), "spread1": (-7.964984, -2.434031),
+    "spread2": (0.006274, 0.450493), "D2": (1.423287, 3.671155),
+    "PPE": (0.044539, 0.527367),
+}
+
+SCHEMAS = {s.name: s for s in (DIABETES, HEART, PARKINSONS)}
+
+
+def validate(model_name, X):
+    """Per-row error messages for ``X`` under the schema of ``model_name``."""
+    return SCHEMAS[model_name].validate(X)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Full health screen: one patient record scored by all three models.
+
+PURPOSE:
+--------
+Instead of entering shared data (age) once per disease page and scoring
+each model separately, a screen takes one patient record holding the
+union of all model inputs and scores the three models in one fused,
+vectorized step:
+
+* every model input maps to one patient field (``FIELDS``); inputs that
+  describe the same quantity map to the same field (``SHARED_FIELDS``),
+* the three coefficient vectors are stacked into one
+  ``(n_fields, 3)`` matrix, zero where a model does not use a field, so a
+  block of patients is scored with a single ``Z @ W + b``,
+* each model's validation rules still apply to its own inputs only; a
+  model whose inputs are invalid (e.g. no voice recording for
+  Parkinson's) gets no risk, the other two are still reported.
+
+Probabilities agree with the per-model engine up to floating-point
+rounding (the fused product sums the same terms in a different order).
+``screen_csv`` produces a three-column risk table for a cohort file in
+one chunked pass.
+
+USAGE:
+------
+    python screening.py cohort.csv risks.csv
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import argparse
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from audit_log import audit
+from linear_engine import expit, get_linear
+from schema import SCHEMAS, ModelSchema
+
+MODEL_NAMES = tuple(SCHEMAS)
+
+# Patient field -> the input it stands for in each model that uses it
+SHARED_FIELDS = {
+    "age": {"diabetes": "Age", "heart": "age"},
+}
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+# =========================================================
+# 🧾 PATIENT FIELDS
+# =========================================================
+def _field(model_name, key):
+    for field, keys in SHARED_FIELDS.items():
+        if keys.get(model_name) == key:
+            return field
+    return key
+
+
+def _build_fields():
+    fields, sections = [], {}
+    for name in MODEL_NAMES:
+        own = []
+        for feature in SCHEMAS[name].features:
+            field = _field(name, feature.key)
+            if field not in fields:
+                fields.append(field)
+                own.append(replace(feature, key=field))
+        sections[name] = ModelSchema(
+            name=name,
+            features=tuple(own),
+            layout=tuple(min(4, len(own) - i) for i in range(0, len(own), 4)),
+        )
+    return tuple(fields), sections
+
+
+# FIELDS: column order of a patient matrix. SECTIONS: per model, the form
+# widgets of the fields it introduces (shared fields appear only once).
+FIELDS, SECTIONS = _build_fields()
+FIELD_INDEX = {field: i for i, field in enumerate(FIELDS)}
+
+# Columns of the patient matrix feeding each model, in its feature order
+COLUMNS = {
+    name: np.array([FIELD_INDEX[_field(name, k)] for k in SCHEMAS[name].keys])
+    for name in MODEL_NAMES
+}
+
+
+def as_matrix(Z):
+    """Convert ``Z`` to a float64 ``(n_patients, len(FIELDS))`` array."""
+    Z = np.asarray(Z, dtype=np.float64)
+    if Z.ndim == 1:
+        Z = Z.reshape(1, -1)
+    if Z.ndim != 2 or Z.shape[1] != len(FIELDS):
+        raise ValueError(
+            f"a screen expects {len(FIELDS)} fields per row; "
+            f"got array of shape {Z.shape}"
+        )
+    return Z
+
+
+def row_from_mapping(values):
+    """One patient row from a ``{field: value}`` mapping (NaN if absent)."""
+    return [values.get(field, np.nan) for field in FIELDS]
+
+
+def model_values(model_name, values):
+    """The ``{model feature: value}`` mapping of one model."""
+    return {k: values[_field(model_name, k)] for k in SCHEMAS[model_name].keys}
+
+
+def patient_values(by_model, updated=None):
+    """The ``{field: value}`` mapping of ``{model: {model feature: value}}``.
+
+    A shared field takes its value from the model updated last;
+    ``updated`` maps model names to update times (ties and missing
+    times fall back to ``MODEL_NAMES`` order).
+    """
+    updated = updated or {}
+    values = {}
+    for name in sorted(MODEL_NAMES, key=lambda n: -updated.get(n, 0.0)):
+        for key, value in by_model[name].items():
+            values.setdefault(_field(name, key), value)
+    return values
+
+
+# =========================================================
+# 🧮 STACKED MODEL
+# =========================================================
+@dataclass(frozen=True)
+class StackedModel:
+    """The three linear models as one ``(n_fields, 3)`` weight matrix."""
+
+    weights: np.ndarray      # (n_fields, n_models)
+    intercepts: np.ndarray   # (n_models,)
+    classes: tuple           # per model, (2,) class labels
+    versions: tuple          # per model, source .sav version
+
+    def score(self, Z):
+        """``(predictions, probabilities)``, each ``(n_patients, n_models)``."""
+        scores = Z @ self.weights + self.intercepts
+        positive = scores > 0
+        predictions = np.column_stack([
+            np.take(classes, positive[:, j].astype(np.intp))
+            for j, classes in enumerate(self.classes)
+        ])
+        probabilities = expit(scores.reshape(-1)).reshape(scores.shape)
+        return predictions, probabilities
+
+
+_stacked = None
+_lock = threading.Lock()
+
+
+def get_stacked():
+    """The stacked model, rebuilt whenever one of the models changes."""
+    global _stacked
+    models = [get_linear(name) for name in MODEL_NAMES]
+    versions = tuple(m.version for m in models)
+    stacked = _stacked
+    if stacked is not None and stacked.versions == versions:
+        return stacked
+
+    weights = np.zeros((len(FIELDS), len(models)))
+    for j, (name, model) in enumerate(zip(MODEL_NAMES, models)):
+        weights[COLUMNS[name], j] = model.coef.ravel()
+    stacked = StackedModel(
+        weights=weights,
+        intercepts=np.array([m.intercept[0] for m in models]),
+        classes=tuple(m.classes for m in models),
+        versions=versions,
+    )
+    with _lock:
+        _stacked = stacked
+    return stacked
+
+
+# =========================================================
+# 🔍 SCREENING API
+# =========================================================
+def valid_masks(Z):
+    """``(n_patients, n_models)`` mask of the models each row is valid for."""
+    return np.column_stack([
+        SCHEMAS[name].valid_mask(Z[:, COLUMNS[name]]) for name in MODEL_NAMES
+    ])
+
+
+def screen(Z, source=None, stacked=None, wait=False):
+    """Score every patient of ``Z`` with all three models at once.
+
+    Returns ``(predictions, probabilities, valid)``, each of shape
+    ``(n_patients, n_models)`` with columns ordered as ``MODEL_NAMES``.
+    Entries of models a row is not valid for are -1 / NaN / False.
+    Every scored prediction is recorded in the audit log, per model.
+    ``stacked`` is the ``StackedModel`` to score with (default: the one
+    of the active model versions). ``wait`` is passed to the audit log
+    (bulk callers wait for queue room instead of dropping records).
+    """
+    start = time.perf_counter()
+    Z = as_matrix(Z)
+    with metrics.stage("screen", "validate"):
+        valid = valid_masks(Z)
+    with metrics.stage("screen", "predict"):
+        stacked = stacked or get_stacked()
+        # NaN x 0 is NaN: zero missing fields so they cannot leak into the
+        # models that do not use them (rows missing a model's own inputs
+        # are masked out below anyway)
+        finite = np.isfinite(Z)
+        predictions, probabilities = stacked.score(
+            Z if finite.all() else np.where(finite, Z, 0.0)
+        )
+        predictions = np.where(valid, predictions, -1)
+        probabilities = np.where(valid, probabilities, np.nan)
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    for j, name in enumerate(MODEL_NAMES):
+        rows = valid[:, j]
+        if not rows.any():
+            continue
+        metrics.inc("rows_scored", name, int(rows.sum()))
+        if audit is not None:
+            audit.log(
+                name, stacked.versions[j], SCHEMAS[name].keys,
+                Z[rows][:, COLUMNS[name]], predictions[rows, j],
+                probabilities[rows, j], latency_ms, source, wait=wait,
+            )
+    return predictions, probabilities, valid
+
+
+def errors(Z):
+    """Per row, ``{model: [error messages]}`` of the models it fails."""
+    Z = as_matrix(Z)
+    out = [{} for _ in range(len(Z))]
+    for name in MODEL_NAMES:
+        for i, messages in enumerate(SCHEMAS[name].validate(Z[:, COLUMNS[name]])):
+            if messages:
+                out[i][name] = messages
+    return out
+
+
+# =========================================================
+# 📋 BATCH RISK TABLE
+# =========================================================
+def screen_frame(frame, source="batch"):
+    """Screen one DataFrame chunk; returns the three-column risk table.
+
+    Fields missing from ``frame`` count as missing values, so a cohort
+    without voice recordings still gets diabetes and heart risks. Extra
+    columns (patient IDs, ...) are passed through unchanged.
+    """
+    if not any(field in frame.columns for field in FIELDS):
+        raise ValueError("CSV has none of the screening fields")
+    Z = (
+        frame.reindex(columns=list(FIELDS))
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=np.float64)
+    )
+    _, probabilities, valid = screen(Z, source=source, wait=True)
+
+    out = frame.copy()
+    for j, name in enumerate(MODEL_NAMES):
+        out[f"{name}_risk"] = probabilities[:, j]
+    messages = [""] * len(frame)
+    incomplete = np.flatnonzero(~valid.all(axis=1))
+    for i, row_errors in zip(incomplete, errors(Z[incomplete])):
+        messages[i] = "; ".join(
+            f"{name}: {m}" for name, ms in row_errors.items() for m in ms
+        )
+    out["errors"] = messages
+    return out
+
+
+def screen_csv(source, destination, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Screen the CSV ``source`` into ``destination`` chunk by chunk.
+
+    Returns ``(rows, incomplete_rows)``, where incomplete rows lack a
+    risk for at least one model.
+    """
+    rows = incomplete = 0
+    with pd.read_csv(source, chunksize=chunk_size) as reader:
+        for i, chunk in enumerate(reader):
+            out = screen_frame(chunk)
+            out.to_csv(destination, mode="w" if i == 0 else "a",
+                       header=(i == 0), index=False)
+            rows += len(out)
+            incomplete += int((out["errors"] != "").sum())
+            if progress is not None:
+                progress(rows)
+    return rows, incomplete
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full health screen of a cohort CSV")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        rows, incomplete = screen_csv(args.source, args.destination, args.chunk_size)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(f"Screened {rows:,} patients ({incomplete:,} incomplete) "
+          f"in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+What-if sensitivity grids for the Health Predictor Web App.
+
+PURPOSE:
+--------
+Shows how the predicted risk of one patient changes while one or two of
+their inputs vary over a range (e.g. Glucose x BMI for diabetes, chol x
+thalach for heart), as a curve or a heatmap.
+
+Every model is linear in its inputs, so varying features ``i`` and
+``j`` only shifts the decision value of the baseline row by
+``coef[i] * dx + coef[j] * dy``. A whole grid is therefore one outer sum
+plus a sigmoid: a 1000 x 1000 grid costs a few milliseconds and never
+materializes a ``(points, n_features)`` input matrix. Grids use the
+vectorized ``np.exp`` sigmoid (within one ulp of ``predict_proba``).
+
+Grids are cached per model version, baseline row, features, ranges and
+resolution, so re-rendering a page (e.g. moving an unrelated slider)
+does not recompute them. The cache is bounded by the bytes of the grids
+it holds (``CACHE_BYTES``), least recently used first out.
+
+USAGE:
+------
+    xs, risk = sensitivity.grid_1d("diabetes", row, "Glucose")
+    xs, ys, risk = sensitivity.grid_2d("heart", row, "chol", "thalach")
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+from linear_engine import expit, get_linear
+from schema import PARKINSONS_RANGES, SCHEMAS
+
+# Largest grid (points) computed in one call: the UI's 1000 x 1000
+MAX_POINTS = 1_000_000
+
+# Bytes of grids kept by the cache (a 1000 x 1000 grid takes 8 MB)
+CACHE_BYTES = 64 * 1024 * 1024
+
+# Feature pair offered first on each page
+DEFAULT_PAIRS = {
+    "diabetes": ("Glucose", "BMI"),
+    "heart": ("chol", "thalach"),
+    "parkinsons": ("spread1", "PPE"),
+}
+
+
+# =========================================================
+# 📏 AXES
+# =========================================================
+def _feature(model_name, key):
+    schema = SCHEMAS[model_name]
+    return schema.features[schema.keys.index(key)]
+
+
+def feature_range(model_name, key):
+    """Default ``(low, high)`` plotting range of one feature."""
+    if model_name == "parkinsons" and key in PARKINSONS_RANGES:
+        return PARKINSONS_RANGES[key]
+    f = _feature(model_name, key)
+    lo = 0.0 if f.min_value is None else float(f.min_value)
+    hi = lo + 1.0 if f.max_value is None else float(f.max_value)
+    return lo, hi
+
+
+def axis(model_name, key, lo, hi, points):
+    """Grid values of one feature; whole numbers for integer features."""
+    if _feature(model_name, key).dtype is int:
+        lo, hi = int(np.ceil(lo)), int(np.floor(hi))
+        if hi - lo + 1 <= points:
+            return np.arange(lo, hi + 1, dtype=np.float64)
+        return np.unique(np.round(np.linspace(lo, hi, points)))
+    return np.linspace(lo, hi, points)
+
+
+# =========================================================
+# 🧮 GRIDS
+# =========================================================
+def _grid(model_name, model, base, keys, ranges, points):
+    with metrics.stage(model_name, "sensitivity"):
+        coef = model.coef.ravel()
+        base = np.asarray(base, dtype=np.float64)
+        # Decision value of the baseline row
+        offset = float(base @ coef + model.intercept[0])
+
+        axes, shift = [], 0.0
+        for dim, (key, (lo, hi), n) in enumerate(zip(keys, ranges, points)):
+            i = SCHEMAS[model_name].keys.index(key)
+            values = axis(model_name, key, lo, hi, n)
+            delta = coef[i] * (values - base[i])
+            # x varies along the last axis, y along the first
+            shift = shift + (delta if dim == 0 else delta[:, None])
+            axes.append(values)
+
+        scores = np.asarray(offset + shift, dtype=np.float64)
+        risk = expit(scores.reshape(-1), exact=False).reshape(scores.shape)
+    for a in (*axes, risk):
+        a.flags.writeable = False
+    return (*axes, risk)
+
+
+class _GridCache:
+    """LRU cache of grids, bounded by the bytes of the arrays it holds."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            grid = self._grids.get(key)
+            if grid is not None:
+                self._grids.move_to_end(key)
+            return grid
+
+    def put(self, key, grid):
+        size = sum(a.nbytes for a in grid)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._grids:
+                return
+            self._grids[key] = grid
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, old = self._grids.popitem(last=False)
+                self.nbytes -= sum(a.nbytes for a in old)
+
+    def clear(self):
+        with self._lock:
+            self._grids.clear()
+            self.nbytes = 0
+
+
+cache = _GridCache(CACHE_BYTES)
+
+
+def _cached(model_name, base, keys, ranges, points, model=None):
+    if int(np.prod(points)) > MAX_POINTS:
+        raise ValueError(f"grid larger than {MAX_POINTS:,} points")
+    base = tuple(float(v) for v in base)
+    ranges = tuple(
+        feature_range(model_name, k) if r is None else (float(r[0]), float(r[1]))
+        for k, r in zip(keys, ranges)
+    )
+    # One model for the key and the grid: a hot swap in between must not
+    # file the new model's grid under the old version
+    model = model or get_linear(model_name)
+    key = (model_name, model.version, base, tuple(keys), ranges, tuple(points))
+    grid = cache.get(key)
+    if grid is None:
+        grid = _grid(model_name, model, base, tuple(keys), ranges, tuple(points))
+        cache.put(key, grid)
+    return grid
+
+
+def grid_1d(model_name, base, key, value_range=None, points=200, model=None):
+    """``(xs, risk)``: positive-class probability as ``key`` varies.
+
+    ``base`` is the baseline feature row in the model's feature order;
+    ``value_range`` defaults to ``feature_range``. ``model`` is the
+    ``LinearModel`` to use (default: the active one). Returned arrays are
+    read-only (they are shared through the cache).
+    """
+    return _cached(model_name, base, (key,), (value_range,), (points,), model)
+
+
+def grid_2d(model_name, base, x_key, y_key, x_range=None, y_range=None,
+            points=(100, 100), model=None):
+    """``(xs, ys, risk)`` with ``risk[iy, ix]`` as ``x_key`` and ``y_key`` vary."""
+    return _cached(
+        model_name, base, (x_key, y_key), (x_range, y_range), tuple(points), model
+    )
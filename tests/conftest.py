@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""Shared pytest setup: import the app modules from the repository root."""
+import os
+import sys
+
+# Set before any app module is imported: tests never write the audit log
+os.environ["MDPS_AUDIT_LOG"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
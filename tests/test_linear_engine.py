@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""The linear engine scores exactly like the pickled sklearn estimators."""
+import numpy as np
+import pytest
+
+from linear_engine import (
+    LinearModel, export_path, file_version, load_export, matches_estimator,
+    parity_rows,
+)
+from model_registry import MODEL_FILES, registry
+
+MODEL_NAMES = sorted(MODEL_FILES)
+
+
+@pytest.mark.parametrize("name", MODEL_NAMES)
+def test_extracted_model_matches_estimator(name):
+    estimator = registry.get(name)
+    model = LinearModel.from_estimator(name, estimator)
+    X = parity_rows(model.n_features, 20_000, seed=1)
+    assert matches_estimator(model, estimator, X)
+
+
+@pytest.mark.parametrize("name", MODEL_NAMES)
+def test_export_matches_estimator(name):
+    estimator = registry.get(name)
+    model = load_export(name, export_path(name))
+    assert model.version == file_version(registry.path(name))
+    X = parity_rows(model.n_features, 20_000, seed=2)
+    assert matches_estimator(model, estimator, X)
+
+
+def test_parity_rows_reach_both_sigmoid_tails():
+    model = LinearModel.from_estimator("heart", registry.get("heart"))
+    probabilities = model.predict_proba(parity_rows(model.n_features, 20_000))[:, 1]
+    assert probabilities.min() == 0.0
+    assert probabilities.max() == 1.0
+
+
+@pytest.mark.parametrize("name", MODEL_NAMES)
+def test_score_agrees_with_predict(name):
+    model = LinearModel.from_estimator(name, registry.get(name))
+    X = parity_rows(model.n_features, 1_000, seed=3)
+    predictions, probabilities = model.score(X)
+    np.testing.assert_array_equal(predictions, model.predict(X))
+    np.testing.assert_array_equal(probabilities, model.predict_proba(X)[:, 1])
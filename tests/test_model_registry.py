@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Hot swap and rollback of the served model versions."""
+from types import SimpleNamespace
+
+import pytest
+
+from model_registry import ModelRegistry
+
+
+def versioned(version):
+    return SimpleNamespace(version=version)
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry(keep=2)
+
+
+def test_activate_swaps_and_keeps_history(registry):
+    assert registry.active("heart") is None
+    registry.activate("heart", versioned("aaa"))
+    registry.activate("heart", versioned("bbb"))
+
+    assert registry.active("heart").version == "bbb"
+    assert [e.version for e in registry.history("heart")] == ["aaa"]
+
+
+def test_reactivating_the_active_version_is_a_no_op(registry):
+    registry.activate("heart", versioned("aaa"))
+    registry.activate("heart", versioned("aaa"))
+    assert registry.history("heart") == []
+
+
+def test_rollback_to_previous_version(registry):
+    first = versioned("aaa")
+    registry.activate("heart", first)
+    registry.activate("heart", versioned("bbb"))
+
+    entry = registry.rollback("heart")
+    assert entry.version == "aaa"
+    assert registry.active("heart").model is first
+    # The replaced version can be rolled forward again
+    assert [e.version for e in registry.history("heart")] == ["bbb"]
+
+
+def test_rollback_by_version_prefix(registry):
+    for version in ("aaa111", "bbb222", "ccc333"):
+        registry.activate("heart", versioned(version))
+    assert registry.rollback("heart", "aaa").version == "aaa111"
+    assert [e.version for e in registry.history("heart")] == ["ccc333", "bbb222"]
+
+
+def test_history_is_bounded_by_keep(registry):
+    for version in ("a", "b", "c", "d"):
+        registry.activate("heart", versioned(version))
+    assert [e.version for e in registry.history("heart")] == ["c", "b"]
+
+
+def test_rollback_without_history_raises(registry):
+    with pytest.raises(LookupError):
+        registry.rollback("heart")
+    registry.activate("heart", versioned("aaa"))
+    with pytest.raises(LookupError):
+        registry.rollback("heart", "zzz")
+
+
+def test_models_are_isolated(registry):
+    registry.activate("heart", versioned("aaa"))
+    registry.activate("diabetes", versioned("bbb"))
+    assert registry.active("heart").version == "aaa"
+    assert registry.history("diabetes") == []
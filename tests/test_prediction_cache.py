@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Model-version invalidation of the shared prediction cache."""
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+def store_rows(cache, version, X):
+    keys = cache.row_keys("heart", version, X)
+    cache.lookup("heart", version, keys)
+    cache.store("heart", version, keys, np.ones(len(X)), np.full(len(X), 0.75))
+    return keys
+
+
+def test_hits_within_one_version():
+    cache = PredictionCache()
+    X = np.arange(12.0).reshape(4, 3)
+    keys = store_rows(cache, "v1", X)
+    assert cache.lookup("heart", "v1", keys) == {i: (1, 0.75) for i in range(4)}
+
+
+def test_new_version_misses_and_drops_old_entries():
+    cache = PredictionCache()
+    X = np.arange(12.0).reshape(4, 3)
+    store_rows(cache, "v1", X)
+    assert cache.stats()["entries"] == 4
+
+    assert cache.lookup("heart", "v2", cache.row_keys("heart", "v2", X)) == {}
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_keeps_other_models():
+    cache = PredictionCache()
+    X = np.arange(6.0).reshape(2, 3)
+    store_rows(cache, "v1", X)
+    keys = cache.row_keys("diabetes", "v1", X)
+    cache.lookup("diabetes", "v1", keys)
+    cache.store("diabetes", "v1", keys, [0, 0], [0.1, 0.2])
+
+    cache.invalidate("heart")
+    assert cache.stats()["entries"] == 2
+    assert len(cache.lookup("diabetes", "v1", keys)) == 2
+
+
+def test_disk_tier_survives_restart_and_drops_old_versions(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    X = np.arange(12.0).reshape(4, 3)
+    cache = PredictionCache(db_path=db_path)
+    keys = store_rows(cache, "v1", X)
+    cache.flush()
+
+    restarted = PredictionCache(db_path=db_path)
+    assert len(restarted.lookup("heart", "v1", keys)) == 4
+    assert restarted.stats()["disk_hits"] == 4
+
+    # A new version invalidates the stored rows of the old one on disk too
+    restarted.lookup("heart", "v2", restarted.row_keys("heart", "v2", X))
+    restarted.flush()
+    assert PredictionCache(db_path=db_path).lookup("heart", "v1", keys) == {}
+
+
+def test_negative_zero_shares_a_key():
+    cache = PredictionCache()
+    assert cache.row_keys("heart", "v1", [[0.0]]) == cache.row_keys("heart", "v1", [[-0.0]])
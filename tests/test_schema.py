@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Vectorized validation masks of the model schemas."""
+import numpy as np
+import pytest
+
+from explain import REFERENCE
+from schema import SCHEMAS
+
+
+def reference_rows(name, n=4):
+    schema = SCHEMAS[name]
+    return np.tile([REFERENCE[name][k] for k in schema.keys], (n, 1)).astype(np.float64)
+
+
+@pytest.mark.parametrize("name", sorted(SCHEMAS))
+def test_reference_rows_are_valid(name):
+    X = reference_rows(name)
+    assert SCHEMAS[name].valid_mask(X).all()
+    assert SCHEMAS[name].validate(X) == [[]] * len(X)
+
+
+@pytest.mark.parametrize("name", sorted(SCHEMAS))
+@pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+def test_non_finite_values_are_missing(name, value):
+    schema = SCHEMAS[name]
+    X = reference_rows(name)
+    X[1, 0] = value
+    np.testing.assert_array_equal(schema.valid_mask(X), [True, False, True, True])
+    label = schema.features[0].label
+    assert f"⚠️ {label} is missing or not a number." in schema.validate(X)[1]
+
+
+def test_inf_in_unbounded_feature_is_missing():
+    # Parkinson's voice features have no range check to catch ±inf
+    schema = SCHEMAS["parkinsons"]
+    assert schema.features[0].min_value is None
+    X = reference_rows("parkinsons", 2)
+    X[0, 0] = np.inf
+    np.testing.assert_array_equal(schema.valid_mask(X), [False, True])
+
+
+def test_range_and_whole_number_masks():
+    schema = SCHEMAS["heart"]
+    age = schema.keys.index("age")
+    X = reference_rows("heart", 4)
+    X[0, age] = 121      # above max_value
+    X[1, age] = 0        # below min_value
+    X[2, age] = 55.5     # int feature
+    np.testing.assert_array_equal(schema.valid_mask(X), [False, False, False, True])
+    errors = schema.validate(X)
+    assert "⚠️ Age must be a whole number." in errors[2]
+    assert errors[3] == []
+
+
+def test_error_masks_have_one_entry_per_row():
+    X = reference_rows("diabetes", 7)
+    for _, mask in SCHEMAS["diabetes"].error_masks(X):
+        assert mask.shape == (7,)
+        assert mask.dtype == bool
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Streamlit components of the Health Predictor pages.
+
+PURPOSE:
+--------
+Form inputs built from the model schemas (their values kept in the
+compact per-session form store, see form_store.py), the batch CSV upload
+section, the per-prediction explanation chart and the what-if
+sensitivity view, used by the page modules in ``app_pages/``.
+"""
+# =========================================================
+# 📦 IMPORTS
+# =========================================================
+import functools
+import os
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import batch_scoring
+import explain
+import form_store
+import inference
+import sensitivity
+
+
+# =========================================================
+# 🧰 HELPERS
+# =========================================================
+def session_id():
+    """Id of the browser session running this script."""
+    return get_script_run_ctx().session_id
+
+
+def render_inputs(schema, start=None):
+    """Number inputs of one form, built from the model's schema.
+
+    ``start`` maps feature keys to the values shown until the user edits
+    them (default: the session's values in the form store, which are
+    updated when a submit changes them).
+    """
+    stored = start is None
+    if stored:
+        start = form_store.get(session_id(), schema.name)
+    values = {}
+    for row in schema.rows():
+        cols = st.columns(len(row)) if len(row) > 1 else [st.container()]
+        for col, feature in zip(cols, row):
+            with col:
+                values[feature.key] = st.number_input(
+                    feature.label, value=start[feature.key], **feature.widget_kwargs()
+                )
+    if stored and values != start:
+        form_store.update(session_id(), schema.name, values)
+    return values
+
+
+def clear_inputs(schema):
+    """Reset one form to the schema defaults (for ``on_click``)."""
+    form_store.reset(session_id(), schema.name)
+    for key in schema.keys:
+        st.session_state.pop(key, None)
+
+
+@st.fragment
+def render_batch_upload(model_name, score_csv=None, caption=None):
+    """CSV upload section: chunked scoring with progress and download.
+
+    ``score_csv(source, destination, progress=...)`` defaults to batch
+    scoring with the model ``model_name``. Runs as a fragment: uploading
+    a file reruns this section only.
+    """
+    if score_csv is None:
+        score_csv = functools.partial(batch_scoring.score_csv, model_name)
+    with st.expander("📂 Batch Prediction (CSV Upload)"):
+        st.caption(
+            caption or "Columns required: "
+            + ", ".join(inference.FEATURES[model_name])
+        )
+        uploaded = st.file_uploader(
+            "Upload a CSV file", type="csv", key=f"{model_name}_batch_csv"
+        )
+        # Scored once per uploaded file: later reruns (download click,
+        # page rerun) reuse the result instead of re-scoring and
+        # re-auditing every row
+        result_key = f"{model_name}_batch_result"
+        result = st.session_state.get(result_key)
+        if result is not None and (uploaded is None
+                                   or result.file_id != uploaded.file_id):
+            st.session_state.pop(result_key).discard()
+            result = None
+        if uploaded is None:
+            return
+        if result is None:
+            result = _score_upload(uploaded, score_csv)
+            st.session_state[result_key] = result
+
+        if result.error:
+            st.error(f"⚠️ {result.error}")
+            return
+        st.progress(1.0, text=f"Scored {result.rows:,} rows")
+        if result.invalid:
+            st.warning(
+                f"⚠️ {result.invalid:,} rows failed validation (see 'errors' column)."
+            )
+        st.download_button(
+            "⬇️ Download Predictions",
+            # Read from disk only when the button is clicked
+            data=result.read,
+            file_name=f"{model_name}_predictions.csv",
+            mime="text/csv",
+            on_click="ignore",
+        )
+
+
+class UploadResult:
+    """One scored upload. The scored CSV stays in a temporary file, not in
+    the session state; the file is deleted by ``discard()`` or once the
+    result is garbage collected (session closed)."""
+
+    def __init__(self, file_id):
+        self.file_id = file_id
+        self.rows = self.invalid = 0
+        self.error = None
+        fd, self.path = tempfile.mkstemp(prefix="mdps-upload-", suffix=".csv")
+        os.close(fd)
+        self._remove = weakref.finalize(self, _remove_file, self.path)
+
+    def read(self):
+        """The scored CSV bytes (for the download button)."""
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    def discard(self):
+        self._remove()
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _score_upload(uploaded, score_csv):
+    """Score one uploaded CSV, with a progress bar, into an ``UploadResult``."""
+    progress_bar = st.progress(0.0, text="Scoring...")
+
+    def report(rows):
+        done = min(uploaded.tell() / max(uploaded.size, 1), 1.0)
+        progress_bar.progress(done, text=f"Scored {rows:,} rows")
+
+    result = UploadResult(uploaded.file_id)
+    with open(result.path, "w+b") as results:
+        try:
+            result.rows, result.invalid = score_csv(
+                uploaded, results, progress=report
+            )
+        except ValueError as exc:
+            result.error = str(exc)
+    if result.error:
+        result.discard()
+    progress_bar.empty()
+    return result
+
+
+def render_model_version(version):
+    """Caption naming the model version a result was scored with."""
+    st.caption(f"Model version `{version[:12]}`")
+
+
+def render_explanation(schema, values, limit=10, model=None):
+    """Ranked bar chart of the inputs that drove the last prediction.
+
+    ``model`` is the ``LinearModel`` that made it (default: the active one).
+    """
+    name = schema.name
+    row = inference.row_from_mapping(name, values)
+    labels = {f.key: f.label for f in schema.features}
+    ranked = explain.ranked(name, row, limit, model=model)
+    data = pd.DataFrame({
+        "feature": [labels[k] for k, _ in ranked],
+        "contribution": [v for _, v in ranked],
+        # Red: pushes towards the disease, green: away from it
+        "color": ["#d62728" if v > 0 else "#2ca02c" for _, v in ranked],
+    })
+    st.caption(
+        "Why this result: each input's effect on the log-odds, relative to "
+        "a typical patient (red raises the risk, green lowers it)."
+    )
+    # A plain Vega-Lite spec instead of st.bar_chart: building and
+    # validating the chart through altair costs more than the prediction
+    st.vega_lite_chart(data, {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "y": {"field": "feature", "type": "nominal", "sort": None, "title": None},
+            "x": {"field": "contribution", "type": "quantitative",
+                  "title": "Contribution (log-odds)"},
+            "color": {"field": "color", "type": "nominal", "scale": None},
+            "tooltip": [
+                {"field": "feature", "type": "nominal"},
+                {"field": "contribution", "type": "quantitative", "format": ".3f"},
+            ],
+        },
+    }, width="stretch")
+
+
+def render_sensitivity(schema, values):
+    """What-if section: risk curve / heatmap around the current inputs."""
+    name = schema.name
+    with st.expander("📉 What-if Risk Sensitivity"):
+        if not st.toggle("Show how the risk changes with one or two inputs",
+                         key=f"{name}_whatif"):
+            return
+        if schema.validate_row(values):
+            st.caption("Enter valid inputs above to explore the risk around them.")
+            return
+        # Imported on first use only: altair adds ~0.2 s to a cold start
+        import altair as alt
+
+        features = {f.key: f for f in schema.features}
+        x_default, y_default = sensitivity.DEFAULT_PAIRS[name]
+        col_x, col_y, col_res = st.columns([2, 2, 1])
+        x_key = col_x.selectbox(
+            "Vary", schema.keys, index=schema.keys.index(x_default),
+            format_func=lambda k: features[k].label, key=f"{name}_whatif_x",
+        )
+        y_options = [""] + [k for k in schema.keys if k != x_key]
+        y_key = col_y.selectbox(
+            "and (optional)", y_options,
+            index=y_options.index(y_default) if y_default in y_options else 0,
+            format_func=lambda k: features[k].label if k else "—",
+            key=f"{name}_whatif_y",
+        )
+        points = col_res.select_slider(
+            "Resolution", [50, 100, 200, 500, 1000], value=200,
+            key=f"{name}_whatif_points",
+        )
+
+        def range_slider(key):
+            f = features[key]
+            lo, hi = sensitivity.feature_range(name, key)
+            lo, hi = min(lo, values[key]), max(hi, values[key])
+            if f.dtype is int:
+                lo, hi = int(lo), int(hi)
+            return st.slider(
+                f"{f.label} range", lo, hi, (lo, hi),
+                step=None if f.dtype is int else (hi - lo) / 100,
+                format=f.format, key=f"{name}_whatif_range_{key}",
+            )
+
+        base = inference.row_from_mapping(name, values)
+        x_range = range_slider(x_key)
+        if not y_key:
+            xs, risk = sensitivity.grid_1d(name, base, x_key, x_range, points)
+            data = pd.DataFrame({"x": xs, "risk": risk})
+            chart = alt.Chart(data).mark_line().encode(
+                x=alt.X("x:Q", title=features[x_key].label),
+                y=alt.Y("risk:Q", title="Risk", scale=alt.Scale(domain=[0, 1]),
+                        axis=alt.Axis(format="%")),
+                tooltip=[alt.Tooltip("x:Q", title=features[x_key].label),
+                         alt.Tooltip("risk:Q", format=".1%")],
+            )
+            marker = pd.DataFrame({"x": [values[x_key]]})
+            chart += alt.Chart(marker).mark_rule(strokeDash=[4, 4]).encode(x="x:Q")
+        else:
+            y_range = range_slider(y_key)
+            xs, ys, risk = sensitivity.grid_2d(
+                name, base, x_key, y_key, x_range, y_range, (points, points)
+            )
+            # Draw at most ~120 x 120 cells; the grid itself is full resolution
+            sx = max(1, len(xs) // 120)
+            sy = max(1, len(ys) // 120)
+            xs, ys, risk = xs[::sx], ys[::sy], risk[::sy, ::sx]
+            dx = np.diff(xs).min() if len(xs) > 1 else 1.0
+            dy = np.diff(ys).min() if len(ys) > 1 else 1.0
+            gx, gy = np.meshgrid(xs, ys)
+            data = pd.DataFrame({
+                "x": gx.ravel() - dx / 2, "x2": gx.ravel() + dx / 2,
+                "y": gy.ravel() - dy / 2, "y2": gy.ravel() + dy / 2,
+                "risk": risk.ravel(),
+            })
+            chart = alt.Chart(data).mark_rect().encode(
+                x=alt.X("x:Q", title=features[x_key].label), x2="x2",
+                y=alt.Y("y:Q", title=features[y_key].label), y2="y2",
+                color=alt.Color("risk:Q", title="Risk",
+                                scale=alt.Scale(scheme="redyellowgreen",
+                                                reverse=True, domain=[0, 1])),
+                tooltip=[alt.Tooltip("risk:Q", format=".1%")],
+            )
+            marker = pd.DataFrame({"x": [values[x_key]], "y": [values[y_key]]})
+            chart += alt.Chart(marker).mark_point(
+                color="black", size=80, filled=True
+            ).encode(x="x:Q", y="y:Q")
+
+        st.altair_chart(chart, width="stretch")
+        st.caption("Dashed line / dot: the current inputs. All other inputs stay fixed.")